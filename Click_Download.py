@@ -1,79 +1,216 @@
-from playwright.sync_api import sync_playwright
-import time
+from playwright.async_api import async_playwright
+import asyncio
+import glob
+import httpx
 import os
-from datetime import datetime, timedelta
+import time
+import re
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
 import zipfile
 import shutil
 
-def login_and_download(username, password, output_dir, currency_pairs):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
+# DEBUG_BROWSER=1 のときのみブラウザ画面を表示する
+DEBUG_BROWSER = os.environ.get("DEBUG_BROWSER") == "1"
+
+# 同時ダウンロード数の上限（サーバー負荷とのバランス）
+MAX_CONCURRENT_DOWNLOADS = 4
+
+# 一時エラー（通信障害・429・5xx）時の1ファイルあたりのリトライ回数
+MAX_DOWNLOAD_RETRIES = 3
+
+HISTORICAL_LIST_URL = "https://tb.click-sec.com/fx/historical/historicalDataList.do"
+
+# ストリーミング保存時の読み出し単位（書き込み回数を減らす）
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# ダウンロード対象の月数（当月を含む）
+MONTHS_TO_DOWNLOAD = 12
+
+# 当月分は更新されるため、この秒数より古ければ再取得する
+CURRENT_MONTH_REFRESH_SECONDS = 24 * 60 * 60
+
+def recent_months(today, count):
+    """当月から遡ってcountヶ月分の (年, 月) を古い順に返す"""
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    months.reverse()
+    return months
+
+def find_downloaded_file(output_dir, currency_code, target_year, target_month):
+    """ダウンロード済みの月次ファイル（空でないもの）を探す"""
+    pattern = os.path.join(output_dir, f"*{currency_code}*{target_year}{target_month:02d}*")
+    for path in glob.glob(pattern):
+        if not path.endswith(".part") and os.path.getsize(path) > 0:
+            return path
+    return None
+
+def is_already_downloaded(output_dir, currency_code, target_year, target_month, today):
+    """再取得が不要かどうかを判定（当月分は1日以上経過していれば再取得）"""
+    path = find_downloaded_file(output_dir, currency_code, target_year, target_month)
+    if path is None:
+        return False
+    if (target_year, target_month) == (today.year, today.month):
+        return time.time() - os.path.getmtime(path) <= CURRENT_MONTH_REFRESH_SECONDS
+    return True
+
+def build_cookie_jar(playwright_cookies):
+    """PlaywrightのCookie一覧をhttpx用のCookieJarに変換"""
+    cookies = httpx.Cookies()
+    for cookie in playwright_cookies:
+        cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+    return cookies
+
+async def collect_download_links(page, list_url):
+    """年ページを1回だけ読み込み、(c, n, m) をキーとするリンク辞書を作成"""
+    await page.goto(list_url)
+    await page.wait_for_load_state("networkidle")
+    hrefs = await page.eval_on_selector_all("a[href*='m=']", "els => els.map(e => e.href)")
+
+    link_map = {}
+    for href in hrefs:
+        query = parse_qs(urlparse(href).query)
+        if all(key in query for key in ("c", "n", "m")):
+            link_map[(query["c"][0], query["n"][0], query["m"][0])] = href
+    return link_map
+
+def filename_from_response(response, fallback):
+    """Content-Dispositionヘッダーから保存ファイル名を決定"""
+    disposition = response.headers.get("content-disposition", "")
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition)
+    return match.group(1) if match else fallback
+
+async def fetch_file(client, url, output_dir, fallback_name):
+    """1ファイルをストリーミングで保存（途中失敗時に不完全なファイルを残さない）"""
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        file_path = os.path.join(output_dir, filename_from_response(response, fallback_name))
+        part_path = file_path + ".part"
+        try:
+            with open(part_path, 'wb') as f:
+                async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(part_path, file_path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    return file_path
+
+def is_retryable(error):
+    """一時的なエラー（通信障害・429・5xx）かどうか"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+async def download_pair(client, semaphore, job, output_dir):
+    """1通貨ペア・1ヶ月分のファイルをHTTP GETで直接ダウンロード
+
+    一時的なエラーは指数バックオフで再試行し、成功可否を返す。
+    """
+    url, currency_code, pair_info, target_year, target_month = job
+    label = f"{currency_code} ({target_year}-{target_month:02d})"
+    fallback_name = f"{currency_code}_{target_year}{target_month:02d}.zip"
+
+    async with semaphore:
+        print(f"  Downloading {pair_info['name']} ({currency_code}) for {target_year}-{target_month:02d}")
+        for attempt in range(MAX_DOWNLOAD_RETRIES):
+            try:
+                file_path = await fetch_file(client, url, output_dir, fallback_name)
+                print(f"  > ファイルを保存しました: {file_path}")
+                return True
+            except httpx.HTTPError as e:
+                if not is_retryable(e):
+                    print(f"  {label} のダウンロードに失敗しました: {e}")
+                    return False
+                print(f"  {label} 一時エラーのため再試行します ({attempt + 1}/{MAX_DOWNLOAD_RETRIES}): {e}")
+                await asyncio.sleep(2 ** attempt)
+        print(f"  {label} はリトライ上限に達したためダウンロードできませんでした。")
+        return False
+
+async def download_all(client, semaphore, jobs, output_dir):
+    """全ジョブを並列実行し、失敗したジョブの一覧を返す"""
+    results = await asyncio.gather(*[download_pair(client, semaphore, job, output_dir) for job in jobs])
+    return [job for job, ok in zip(jobs, results) if not ok]
+
+async def login_and_download(username, password, output_dir, currency_pairs):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=not DEBUG_BROWSER,
+            args=['--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage']
+        )
+        context = await browser.new_context()
+        page = await context.new_page()
 
         try:
             # ログインページにアクセス
-            page.goto("https://sec-sso.click-sec.com/loginweb/sessionInvalidate")
+            await page.goto("https://sec-sso.click-sec.com/loginweb/sessionInvalidate")
 
             # ログイン情報を入力
-            page.fill("#j_username", username)
-            page.fill("#j_password", password)
+            await page.fill("#j_username", username)
+            await page.fill("#j_password", password)
 
             # ログインボタンをクリック
-            page.click("button[name='LoginForm']")
-            page.wait_for_load_state("networkidle")
+            await page.click("button[name='LoginForm']")
+            await page.wait_for_load_state("networkidle")
             print("ログインに成功しました。")
 
             # --- ダウンロード対象月を定義 ---
             today = datetime.now()
-            months_to_download = []
-            for i in range(12): # 過去12ヶ月分
-                target_date = today - timedelta(days=30*i) # 約30日*iで月を遡る
-                months_to_download.append((target_date.year, target_date.month))
-            
-            # 重複を排除し、古い順にソート
-            months_to_download = sorted(list(set(months_to_download)))
-
-            # --- 月ごとにループしてダウンロード ---
-            for target_year, target_month in months_to_download:
-                print(f"\n--- 年月: {target_year}年 {target_month}月 の処理を開始 ---")
-
-                # 正しい年のページに遷移
-                # サイトの仕様上、現在の年でない場合は年を指定してURLにアクセスする必要がある
+            months_to_download = recent_months(today, MONTHS_TO_DOWNLOAD)
+
+            # --- 年ページごとにダウンロードリンクを収集 ---
+            # サイトの仕様上、現在の年でない場合は年を指定してURLにアクセスする必要がある
+            links_by_year = {}
+            for target_year in sorted({year for year, _ in months_to_download}):
                 if target_year != today.year:
-                    print(f"{target_year}年のデータページに移動します。")
-                    page.goto(f"https://tb.click-sec.com/fx/historical/historicalDataList.do?y={target_year}")
+                    print(f"{target_year}年のデータページを読み込みます。")
+                    list_url = f"{HISTORICAL_LIST_URL}?y={target_year}"
                 else:
-                    page.goto("https://tb.click-sec.com/fx/historical/historicalDataList.do")
-                page.wait_for_load_state("networkidle")
-
-                # --- 通貨ペアごとにループしてダウンロード ---
-                for currency_code, pair_info in currency_pairs.items():
-                    selector = f"a[href*='c={pair_info['code']}&n={currency_code}'][href*='m={target_month:02d}']"
-                    download_link = page.query_selector(selector)
-
-                    if download_link:
-                        print(f"  Downloading {pair_info['name']} ({currency_code}) for {target_year}-{target_month:02d}")
-                        with page.expect_download() as download_info:
-                            download_link.click()
-                        download = download_info.value
-                        
-                        original_filename = download.suggested_filename
-                        file_path = os.path.join(output_dir, original_filename)
-                        download.save_as(file_path)
-                        print(f"  > ファイルを保存しました: {file_path}")
-                    else:
-                        print(f"  {currency_code} ({target_year}-{target_month:02d}) のリンクが見つかりませんでした。")
-                    
-                    time.sleep(2) # サーバー負荷軽減のための待機
+                    list_url = HISTORICAL_LIST_URL
+                links_by_year[target_year] = await collect_download_links(page, list_url)
+
+            # --- ログインセッションのCookieでHTTP GETを並列実行 ---
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+            cookies = build_cookie_jar(await context.cookies())
+            async with httpx.AsyncClient(cookies=cookies, follow_redirects=True, timeout=60.0) as client:
+                jobs = []
+                for target_year, target_month in months_to_download:
+                    print(f"\n--- 年月: {target_year}年 {target_month}月 のダウンロードを登録 ---")
+                    for currency_code, pair_info in currency_pairs.items():
+                        if is_already_downloaded(output_dir, currency_code, target_year, target_month, today):
+                            print(f"  {currency_code} ({target_year}-{target_month:02d}) はダウンロード済みのためスキップします。")
+                            continue
+
+                        url = links_by_year[target_year].get(
+                            (pair_info['code'], currency_code, f"{target_month:02d}"))
+
+                        if url:
+                            jobs.append((url, currency_code, pair_info, target_year, target_month))
+                        else:
+                            print(f"  {currency_code} ({target_year}-{target_month:02d}) のリンクが見つかりませんでした。")
+
+                failed_jobs = await download_all(client, semaphore, jobs, output_dir)
+
+                # 失敗分のみ最後にまとめて再実行
+                if failed_jobs:
+                    print(f"\n--- 失敗した {len(failed_jobs)} 件を再試行します ---")
+                    failed_jobs = await download_all(client, semaphore, failed_jobs, output_dir)
+                for _, currency_code, _, target_year, target_month in failed_jobs:
+                    print(f"  ダウンロード失敗: {currency_code} ({target_year}-{target_month:02d})")
 
         except Exception as e:
+            # ログインやリンク収集の失敗（個別ダウンロードの失敗はdownload_pairで処理済み）
             print(f"エラーが発生しました: {e}")
-            import traceback
-            traceback.print_exc()
         finally:
             print("\n全ての処理が完了しました。ブラウザを閉じます。")
-            browser.close()
+            await browser.close()
 
 # 使用例
 if __name__ == "__main__":
@@ -97,4 +234,4 @@ if __name__ == "__main__":
         "EURUSD": {"code": "31", "name": "ユーロ/米ドル"}
     }
 
-    login_and_download(username, password, input_dir, currency_pairs)
+    asyncio.run(login_and_download(username, password, input_dir, currency_pairs))
@@ -1,28 +1,43 @@
-import csv
 import json
+import pandas as pd
 import requests
 
+# orjsonがあれば高速なシリアライズに使う
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Webhook URL（GASでデプロイしたURL）
 WEBHOOK_URL = "https://script.google.com/macros/s/AKfycbyg1dMZEouYwtv8X8z_w7V3mnkryqPaJwOEiwObJ6Xb6lMg6rlvEODUp1ZSOQrPry0K/exec"
 
 # CSVファイルのパス
 CSV_FILE = r"C:\Users\furuie\Dropbox\006_TRADE\historycal\entrypoint.csv"
 
-# CSVを読み込んでデータをリスト化
-def read_csv(file_path):
-    data = []
-    with open(file_path, mode="r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data.append(row)
-    return data
-
-# WebhookにPOST送信
-def send_to_webhook(data):
+# 1回のPOSTで送信する行数
+CHUNK_SIZE = 5000
+
+# CSVをチャンク単位で読み込む（全行をメモリに載せない）
+def read_csv_chunks(file_path, chunksize=CHUNK_SIZE):
+    # csv.DictReader と同様に全列を文字列として扱う
+    return pd.read_csv(file_path, chunksize=chunksize, encoding="utf-8-sig",
+                       dtype=str, keep_default_na=False)
+
+# 行のリストをJSON配列のバイト列に変換
+def dumps_records(records):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(records)
+    return json.dumps(records).encode("utf-8")
+
+# WebhookにPOST送信（本文は従来どおり行dictのJSON配列。チャンクごとに1回送信する）
+def send_chunk_to_webhook(session, chunk):
     headers = {"Content-Type": "application/json"}
-    response = requests.post(WEBHOOK_URL, data=json.dumps(data), headers=headers)
+    body = dumps_records(chunk.to_dict(orient="records"))
+    response = session.post(WEBHOOK_URL, data=body, headers=headers)
     print("Response:", response.text)
 
-# 実行
-csv_data = read_csv(CSV_FILE)
-send_to_webhook(csv_data)
+# 実行（同一セッションで接続を再利用）
+with requests.Session() as session:
+    for chunk in read_csv_chunks(CSV_FILE):
+        send_chunk_to_webhook(session, chunk)
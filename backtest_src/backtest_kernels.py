@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+backtest_kernels.py - SL/TP監視の数値計算カーネル
+"""
+
+import numpy as np
+
+# numbaがあればJITコンパイルしたカーネルを使う
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# エグジット理由コード
+EXIT_STOP_LOSS = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_TIME = 2
+
+EXIT_REASON_NAMES = ('STOP_LOSS', 'TAKE_PROFIT', 'TIME_EXIT')
+
+
+def scan_position_numpy(prices, trading_mask, entry_price, sl_price, tp_price, sign, pip_multiplier):
+    """SL/TPの最初の到達点と最大含み益・含み損を求める（NumPy版）
+
+    Parameters:
+    -----------
+    prices : np.ndarray
+        監視用価格（float32またはfloat64、時刻順）
+    trading_mask : np.ndarray
+        SLチェック対象の時点（bool）
+    entry_price : float
+        エントリー価格
+    sl_price, tp_price : float
+        SL/TP価格（pricesと同じ精度に丸めた値、無効な場合はNaN）
+    sign : float
+        LONGなら1.0、SHORTなら-1.0
+    pip_multiplier : float
+        pip倍率
+
+    Returns:
+    --------
+    tuple : (エグジット位置, エグジット理由コード, 最大含み益pips, 最大含み損pips)
+    """
+    valid = trading_mask & ~np.isnan(prices)
+
+    # SL/TPに最初に到達した位置（到達しなければ -1）
+    def first_hit(hit):
+        hit &= valid
+        return int(hit.argmax()) if hit.any() else -1
+
+    # 符号を掛けることでLONG/SHORTを同じ比較式で判定（NaNとの比較は常にFalse）
+    sl_idx = first_hit((prices - sl_price) * sign <= 0)
+    tp_idx = first_hit((prices - tp_price) * sign >= 0)
+
+    # 同じ時点で両方に到達した場合はストップロスを優先
+    if sl_idx >= 0 and (tp_idx < 0 or sl_idx <= tp_idx):
+        exit_idx, reason = sl_idx, EXIT_STOP_LOSS
+    elif tp_idx >= 0:
+        exit_idx, reason = tp_idx, EXIT_TAKE_PROFIT
+    else:
+        exit_idx, reason = len(prices) - 1, EXIT_TIME
+
+    # エグジット時点までの最大含み益・含み損（pipsはfloat64で計算）
+    pips_arr = (prices[:exit_idx + 1].astype(np.float64) - entry_price) * (sign * pip_multiplier)
+    observed = pips_arr[valid[:exit_idx + 1]]
+    return exit_idx, reason, float(observed.max(initial=0)), float(observed.min(initial=0))
+
+
+def scan_time_exit(prices, trading_mask, entry_price, sign, pip_multiplier):
+    """SL/TPがともに無効な場合の時間切れエグジット（最大含み益・含み損のみを1回の集約で求める）
+    
+    戻り値は scan_position と同じ形式。
+    """
+    valid = trading_mask & ~np.isnan(prices)
+    pips_arr = (prices[valid].astype(np.float64) - entry_price) * (sign * pip_multiplier)
+    return len(prices) - 1, EXIT_TIME, float(pips_arr.max(initial=0)), float(pips_arr.min(initial=0))
+
+
+def _scan_position_loop(prices, trading_mask, entry_price, sl_price, tp_price, sign, pip_multiplier):
+    """SL/TPの最初の到達点と最大含み益・含み損を1パスで求める（JIT用ループ版）
+    
+    float32の価格はfloat64のentry_price等との演算で昇格するため、pipsはfloat64で集計される。
+    """
+    pip_factor = sign * pip_multiplier
+    max_favorable = 0.0
+    max_adverse = 0.0
+
+    for i in range(prices.shape[0]):
+        price = prices[i]
+        if not trading_mask[i] or np.isnan(price):
+            continue
+
+        pips = (price - entry_price) * pip_factor
+        if pips > max_favorable:
+            max_favorable = pips
+        if pips < max_adverse:
+            max_adverse = pips
+
+        # ストップロス優先
+        if (price - sl_price) * sign <= 0:
+            return i, EXIT_STOP_LOSS, max_favorable, max_adverse
+        if (price - tp_price) * sign >= 0:
+            return i, EXIT_TAKE_PROFIT, max_favorable, max_adverse
+
+    return prices.shape[0] - 1, EXIT_TIME, max_favorable, max_adverse
+
+
+def _scan_long_loop(prices, trading_mask, entry_price, sl_price, tp_price, pip_multiplier):
+    """LONG専用の走査ループ（符号を定数化し、価格とSL/TPを直接比較）"""
+    max_favorable = 0.0
+    max_adverse = 0.0
+    
+    for i in range(prices.shape[0]):
+        price = prices[i]
+        if not trading_mask[i] or np.isnan(price):
+            continue
+        
+        pips = (price - entry_price) * pip_multiplier
+        if pips > max_favorable:
+            max_favorable = pips
+        if pips < max_adverse:
+            max_adverse = pips
+        
+        # ストップロス優先
+        if price <= sl_price:
+            return i, EXIT_STOP_LOSS, max_favorable, max_adverse
+        if price >= tp_price:
+            return i, EXIT_TAKE_PROFIT, max_favorable, max_adverse
+    
+    return prices.shape[0] - 1, EXIT_TIME, max_favorable, max_adverse
+
+
+def _scan_short_loop(prices, trading_mask, entry_price, sl_price, tp_price, pip_multiplier):
+    """SHORT専用の走査ループ（符号を定数化し、価格とSL/TPを直接比較）"""
+    max_favorable = 0.0
+    max_adverse = 0.0
+    
+    for i in range(prices.shape[0]):
+        price = prices[i]
+        if not trading_mask[i] or np.isnan(price):
+            continue
+        
+        pips = (entry_price - price) * pip_multiplier
+        if pips > max_favorable:
+            max_favorable = pips
+        if pips < max_adverse:
+            max_adverse = pips
+        
+        # ストップロス優先
+        if price >= sl_price:
+            return i, EXIT_STOP_LOSS, max_favorable, max_adverse
+        if price <= tp_price:
+            return i, EXIT_TAKE_PROFIT, max_favorable, max_adverse
+    
+    return prices.shape[0] - 1, EXIT_TIME, max_favorable, max_adverse
+
+
+def _scan_long_numpy(prices, trading_mask, entry_price, sl_price, tp_price, pip_multiplier):
+    """LONG用のNumPy版（numbaがない環境向け）"""
+    return scan_position_numpy(prices, trading_mask, entry_price, sl_price, tp_price, 1.0, pip_multiplier)
+
+
+def _scan_short_numpy(prices, trading_mask, entry_price, sl_price, tp_price, pip_multiplier):
+    """SHORT用のNumPy版（numbaがない環境向け）"""
+    return scan_position_numpy(prices, trading_mask, entry_price, sl_price, tp_price, -1.0, pip_multiplier)
+
+
+def _simulate_trades_loop(entry_ns, exit_ns, is_long, entry_price, sl_pips, tp_pips, pip_multiplier,
+                          bar_ns, bar_high, bar_low, bar_close):
+    """複数取引のSL/TP/時間切れエグジットを足データ（OHLC）で一括判定（JIT用ループ版）
+    
+    Parameters:
+    -----------
+    entry_ns, exit_ns : np.ndarray
+        エントリー/エグジット時刻（int64ナノ秒）
+    is_long : np.ndarray
+        LONGならTrue（bool）
+    entry_price : np.ndarray
+        エントリー価格
+    sl_pips, tp_pips : np.ndarray
+        SL/TP幅pips（無効な場合はNaN）
+    pip_multiplier : np.ndarray
+        pip倍率
+    bar_ns : np.ndarray
+        足の時刻（int64ナノ秒、昇順）
+    bar_high, bar_low, bar_close : np.ndarray
+        足の高値・安値・終値
+    
+    Returns:
+    --------
+    tuple : (エグジット価格, エグジット理由コード(int8), pips)
+    """
+    n_trades = entry_ns.shape[0]
+    exit_price = np.empty(n_trades, dtype=np.float64)
+    exit_reason = np.empty(n_trades, dtype=np.int8)
+    pips = np.empty(n_trades, dtype=np.float64)
+    
+    for t in prange(n_trades):
+        sign = 1.0 if is_long[t] else -1.0
+        entry = entry_price[t]
+        sl_price = entry - sign * sl_pips[t] / pip_multiplier[t]
+        tp_price = entry + sign * tp_pips[t] / pip_multiplier[t]
+        
+        lo = np.searchsorted(bar_ns, entry_ns[t], side='left')
+        hi = np.searchsorted(bar_ns, exit_ns[t], side='right')
+        
+        # 期間内に足がなければエントリー価格で時間切れ
+        price = bar_close[hi - 1] if hi > lo else entry
+        reason = EXIT_TIME
+        for i in range(lo, hi):
+            adverse = bar_low[i] if is_long[t] else bar_high[i]
+            favorable = bar_high[i] if is_long[t] else bar_low[i]
+            # 同じ足で両方に到達した場合はストップロスを優先（NaNとの比較は常にFalse）
+            if (adverse - sl_price) * sign <= 0:
+                price, reason = sl_price, EXIT_STOP_LOSS
+                break
+            if (favorable - tp_price) * sign >= 0:
+                price, reason = tp_price, EXIT_TAKE_PROFIT
+                break
+        
+        exit_price[t] = price
+        exit_reason[t] = reason
+        pips[t] = (price - entry) * sign * pip_multiplier[t]
+    
+    return exit_price, exit_reason, pips
+
+
+if NUMBA_AVAILABLE:
+    # NaN判定を保つためfastmathは使わない
+    scan_position = njit(cache=True)(_scan_position_loop)
+    scan_long = njit(cache=True)(_scan_long_loop)
+    scan_short = njit(cache=True)(_scan_short_loop)
+    # 取引単位で独立しているためスレッド並列化
+    simulate_trades = njit(cache=True, parallel=True)(_simulate_trades_loop)
+else:
+    scan_position = scan_position_numpy
+    scan_long = _scan_long_numpy
+    scan_short = _scan_short_numpy
+    simulate_trades = _simulate_trades_loop
+
+# is_long → 方向別に特殊化した走査カーネル
+# 引数は (prices, trading_mask, entry_price, sl_price, tp_price, pip_multiplier)
+SCAN_KERNELS = {True: scan_long, False: scan_short}
@@ -4,43 +4,81 @@
 check_entrypoint_files.py - エントリーポイントファイル構造確認スクリプト
 """
 
+import csv
+import os
 import pandas as pd
+from itertools import islice
 from pathlib import Path
 
+# pyarrowがあればストリーミングCSVリーダーで先頭バッチだけ読む
+try:
+    import pyarrow.csv as pac
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # エントリーポイントディレクトリ
 ENTRYPOINT_DIR = Path(__file__).parent.parent / "entrypoint_fx"
 
+# プレビュー表示する行数
+PREVIEW_ROWS = 3
+
+def count_data_rows(file_path):
+    """ファイル全体をDataFrameにせずにデータ行数（ヘッダー・空行を除く）を数える
+    
+    引用符内に改行を含む値や末尾の改行の有無もpandasでの行数と同じ扱いにする。
+    """
+    with open(file_path, newline='', encoding='utf-8', errors='replace') as f:
+        row_count = sum(1 for row in csv.reader(f) if row)
+    return max(row_count - 1, 0)
+
+def read_preview(file_path):
+    """先頭数行のDataFrameとデータ型一覧を取得"""
+    if PYARROW_AVAILABLE:
+        reader = pac.open_csv(file_path)
+        first_batch = reader.read_next_batch()
+        df = first_batch.slice(0, PREVIEW_ROWS).to_pandas()
+        dtypes = "\n".join(f"{field.name}    {field.type}" for field in reader.schema)
+        return df, dtypes
+    
+    df = pd.read_csv(file_path, nrows=PREVIEW_ROWS)
+    return df, df.dtypes.to_string()
+
 def check_file_structure():
     """ファイル構造を確認"""
-    csv_files = list(ENTRYPOINT_DIR.glob("*.csv"))
+    # 件数はstatせずにscandirで数える
+    csv_count = 0
+    if ENTRYPOINT_DIR.is_dir():
+        with os.scandir(ENTRYPOINT_DIR) as entries:
+            csv_count = sum(1 for entry in entries if entry.name.lower().endswith(".csv"))
     
-    if not csv_files:
+    if not csv_count:
         print(f"❌ CSVファイルが見つかりません: {ENTRYPOINT_DIR}")
         return
     
-    print(f"📂 CSVファイル数: {len(csv_files)}")
+    print(f"📂 CSVファイル数: {csv_count}")
     
     # 最初の3ファイルの構造を確認
-    for i, file_path in enumerate(csv_files[:3]):
+    for i, file_path in enumerate(islice(ENTRYPOINT_DIR.glob("*.csv"), 3)):
         print(f"\n{'='*60}")
         print(f"📄 ファイル {i+1}: {file_path.name}")
         print('='*60)
         
         try:
-            # ファイルを読み込み
-            df = pd.read_csv(file_path)
+            # 先頭数行のみ読み込み
+            df, dtypes = read_preview(file_path)
             
-            print(f"📊 行数: {len(df)}")
+            print(f"📊 行数: {count_data_rows(file_path)}")
             print(f"📋 カラム数: {len(df.columns)}")
             print(f"📝 カラム名: {list(df.columns)}")
             
             # 最初の数行を表示
             print(f"\n📈 データサンプル:")
-            print(df.head(3).to_string())
+            print(df.to_string())
             
             # データ型確認
             print(f"\n🔢 データ型:")
-            print(df.dtypes.to_string())
+            print(dtypes)
             
         except Exception as e:
             print(f"❌ ファイル読み込みエラー: {e}")
@@ -10,8 +10,53 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+# orjsonがあれば高速な読み書きに使う
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 設定スキーマ: 葉は (必須か, 値の検証関数, 検証失敗時のメッセージ)
+_CONFIG_SCHEMA = {
+    "backtest_settings": {
+        "risk_management": {
+            "stop_loss_pips": (True, lambda v: 0 < v <= 100, "stop_loss_pipsは1-100の範囲で設定してください"),
+            "enable_stop_loss": (True, None, None),
+            "take_profit_pips": (False, lambda v: v > 0, "take_profit_pipsは正の値で設定してください"),
+        }
+    },
+    "currency_settings": (True, None, None),
+}
+
+# (pip_value, pip_multiplier) のペア分類テーブル
+JPY_PIP_SPEC = (0.01, 100)
+DEFAULT_PIP_SPEC = (0.0001, 10000)
+
+def _pip_spec(currency_pair: str):
+    """通貨ペアのpip値とpip倍率を返す（円建てペアは末尾JPYで判定）"""
+    return JPY_PIP_SPEC if currency_pair.endswith('JPY') else DEFAULT_PIP_SPEC
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    """JSONファイルを読み込み"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """JSONファイルを書き込み（インデント2、非ASCII文字はそのまま）"""
+    if ORJSON_AVAILABLE:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 class BacktestConfigManager:
     """バックテスト設定管理クラス"""
     
@@ -25,6 +70,16 @@ class BacktestConfigManager:
         """
         self.config_file = Path(config_file)
         self.config = {}
+        self._flat: Dict[str, Any] = {}
+        self.currency_cache: Dict[str, Dict[str, Any]] = {}
+        self._sl_pips: Dict[str, Optional[float]] = {}
+        self._tp_pips: Dict[str, Optional[float]] = {}
+        self._pip_table: Dict[str, tuple] = {}
+        self.sl_enabled = True
+        self.tp_enabled = False
+        self.slippage_pips = 1
+        self.weekend_sl_disabled = True
+        self._loaded_mtime_ns: Optional[int] = None
         self.load_config()
     
     def load_config(self):
@@ -35,8 +90,10 @@ class BacktestConfigManager:
                 self.create_default_config()
                 logger.info(f"デフォルト設定ファイルを作成しました: {self.config_file}")
             
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            # 解析に失敗しても同じファイルを毎回読み直さないよう、更新時刻は解析前に記録
+            self._loaded_mtime_ns = self._file_mtime_ns()
+            self.config = _read_json(self.config_file)
+            self._refresh_caches()
             
             logger.info(f"設定ファイル読み込み完了: {self.config_file}")
             self.validate_config()
@@ -45,13 +102,105 @@ class BacktestConfigManager:
             logger.error(f"設定ファイル読み込みエラー: {e}")
             logger.warning("デフォルト設定を使用します")
             self.config = self.get_default_config()
+            self._refresh_caches()
+    
+    def _file_mtime_ns(self) -> Optional[int]:
+        """設定ファイルの更新時刻（ファイルがなければNone）"""
+        try:
+            return self.config_file.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def is_stale(self) -> bool:
+        """読み込み後に設定ファイルが更新されたか"""
+        return self._file_mtime_ns() != self._loaded_mtime_ns
+    
+    def _refresh_caches(self):
+        """設定から派生する参照テーブルをすべて再構築"""
+        self._rebuild_flat()
+        self._build_currency_cache()
+        self._cache_flags()
+    
+    def _cache_flags(self):
+        """頻繁に参照されるフラグ類をインスタンス属性として保持"""
+        self.sl_enabled = bool(self.get("backtest_settings.risk_management.enable_stop_loss", True))
+        self.tp_enabled = bool(self.get("backtest_settings.risk_management.enable_take_profit", False))
+        self.slippage_pips = self.get("backtest_settings.risk_management.slippage_pips", 1)
+        self.weekend_sl_disabled = bool(self.get("backtest_settings.advanced_settings.weekend_sl_disabled", True))
+    
+    def _rebuild_flat(self):
+        """ドット記法キー → 値 のフラットな参照テーブルを再構築"""
+        self._flat.clear()
+        self._flatten(self.config, prefix='')
+    
+    def _flatten(self, node: Dict[str, Any], prefix: str):
+        """設定ツリーを再帰的に走査し、全階層のキーパスを登録
+        
+        Parameters:
+        -----------
+        node : dict
+            走査対象のノード
+        prefix : str
+            親ノードまでのキーパス
+        """
+        for key, value in node.items():
+            key_path = f"{prefix}{key}"
+            self._flat[key_path] = value
+            if isinstance(value, dict):
+                self._flatten(value, prefix=f"{key_path}.")
+    
+    def _build_currency_cache(self):
+        """設定済み通貨ペアのマージ済み設定とSL/TP値を事前計算"""
+        self.currency_cache.clear()
+        self._sl_pips.clear()
+        self._tp_pips.clear()
+        currency_pairs = self.get("currency_settings", {})
+        self._pip_table = {pair: _pip_spec(pair) for pair in currency_pairs}
+        for currency_pair in currency_pairs:
+            self._cache_currency(currency_pair)
+    
+    def _cache_currency(self, currency_pair: str) -> Dict[str, Any]:
+        """通貨ペア1件分の設定をデフォルト値とマージしてキャッシュ
+        
+        Parameters:
+        -----------
+        currency_pair : str
+            通貨ペア名
+        
+        Returns:
+        --------
+        dict : マージ済み通貨ペア設定
+        """
+        # 通貨ペア別設定
+        currency_config = self.get(f"currency_settings.{currency_pair}", {})
+        
+        # デフォルト値で補完
+        pip_value, pip_multiplier = self._pip_table.get(currency_pair) or _pip_spec(currency_pair)
+        settings = {
+            "pip_value": pip_value,
+            "pip_multiplier": pip_multiplier,
+            "stop_loss_pips": self.get("backtest_settings.risk_management.stop_loss_pips", 15),
+            "take_profit_pips": self.get("backtest_settings.risk_management.take_profit_pips", 30)
+        }
+        settings.update(currency_config)
+        self.currency_cache[currency_pair] = settings
+        
+        # 通貨ペア別設定を優先し、なければグローバル設定
+        currency_sl = currency_config.get("stop_loss_pips")
+        if currency_sl is None:
+            currency_sl = self.get("backtest_settings.risk_management.stop_loss_pips")
+        currency_tp = currency_config.get("take_profit_pips")
+        if currency_tp is None:
+            currency_tp = self.get("backtest_settings.risk_management.take_profit_pips")
+        self._sl_pips[currency_pair] = float(currency_sl) if currency_sl is not None else None
+        self._tp_pips[currency_pair] = float(currency_tp) if currency_tp is not None else None
+        
+        return settings
     
     def create_default_config(self):
         """デフォルト設定ファイルを作成"""
         default_config = self.get_default_config()
-        
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        _write_json(self.config_file, default_config)
     
     def get_default_config(self) -> Dict[str, Any]:
         """デフォルト設定を取得"""
@@ -113,26 +262,7 @@ class BacktestConfigManager:
     def validate_config(self):
         """設定の妥当性をチェック"""
         errors = []
-        
-        # 必須キーの確認
-        required_keys = [
-            "backtest_settings.risk_management.stop_loss_pips",
-            "backtest_settings.risk_management.enable_stop_loss",
-            "currency_settings"
-        ]
-        
-        for key_path in required_keys:
-            if self.get(key_path) is None:
-                errors.append(f"必須設定が不足: {key_path}")
-        
-        # 数値範囲の確認
-        sl_pips = self.get("backtest_settings.risk_management.stop_loss_pips")
-        if sl_pips is not None and (sl_pips <= 0 or sl_pips > 100):
-            errors.append("stop_loss_pipsは1-100の範囲で設定してください")
-        
-        tp_pips = self.get("backtest_settings.risk_management.take_profit_pips")
-        if tp_pips is not None and tp_pips <= 0:
-            errors.append("take_profit_pipsは正の値で設定してください")
+        self._walk_schema(self.config, _CONFIG_SCHEMA, prefix='', errors=errors)
         
         if errors:
             for error in errors:
@@ -140,6 +270,38 @@ class BacktestConfigManager:
         
         logger.info("設定の妥当性チェック完了")
     
+    def _walk_schema(self, node: Any, schema: Dict[str, Any], prefix: str, errors: list):
+        """設定ツリーをスキーマと1回の走査で照合
+        
+        Parameters:
+        -----------
+        node : Any
+            照合対象の設定ノード
+        schema : dict
+            対応するスキーマノード
+        prefix : str
+            親ノードまでのキーパス
+        errors : list
+            検出したエラーの追加先
+        """
+        if not isinstance(node, dict):
+            node = {}
+        
+        for key, spec in schema.items():
+            key_path = f"{prefix}{key}"
+            value = node.get(key)
+            
+            if isinstance(spec, dict):
+                self._walk_schema(value, spec, prefix=f"{key_path}.", errors=errors)
+                continue
+            
+            required, check, message = spec
+            if value is None:
+                if required:
+                    errors.append(f"必須設定が不足: {key_path}")
+            elif check is not None and not check(value):
+                errors.append(message)
+    
     def get(self, key_path: str, default=None):
         """ドット記法で設定値を取得
         
@@ -154,15 +316,7 @@ class BacktestConfigManager:
         --------
         Any : 設定値
         """
-        keys = key_path.split('.')
-        value = self.config
-        
-        try:
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key_path, default)
     
     def get_stop_loss_pips(self, currency_pair: str = None) -> Optional[float]:
         """ストップロス設定を取得
@@ -177,14 +331,14 @@ class BacktestConfigManager:
         float or None : ストップロス pips値
         """
         # 有効/無効チェック
-        if not self.get("backtest_settings.risk_management.enable_stop_loss", True):
+        if not self.sl_enabled:
             return None
         
-        # 通貨ペア別設定を優先
+        # 通貨ペア別設定を優先（キャッシュ済みの値）
         if currency_pair:
-            currency_sl = self.get(f"currency_settings.{currency_pair}.stop_loss_pips")
-            if currency_sl is not None:
-                return float(currency_sl)
+            if currency_pair not in self._sl_pips:
+                self._cache_currency(currency_pair)
+            return self._sl_pips[currency_pair]
         
         # グローバル設定
         global_sl = self.get("backtest_settings.risk_management.stop_loss_pips")
@@ -203,14 +357,14 @@ class BacktestConfigManager:
         float or None : テイクプロフィット pips値
         """
         # 有効/無効チェック
-        if not self.get("backtest_settings.risk_management.enable_take_profit", False):
+        if not self.tp_enabled:
             return None
         
-        # 通貨ペア別設定を優先
+        # 通貨ペア別設定を優先（キャッシュ済みの値）
         if currency_pair:
-            currency_tp = self.get(f"currency_settings.{currency_pair}.take_profit_pips")
-            if currency_tp is not None:
-                return float(currency_tp)
+            if currency_pair not in self._tp_pips:
+                self._cache_currency(currency_pair)
+            return self._tp_pips[currency_pair]
         
         # グローバル設定
         global_tp = self.get("backtest_settings.risk_management.take_profit_pips")
@@ -226,25 +380,13 @@ class BacktestConfigManager:
         
         Returns:
         --------
-        dict : 通貨ペア設定
+        dict : 通貨ペア設定（キャッシュの複製）
         """
-        # 通貨ペア別設定
-        currency_config = self.get(f"currency_settings.{currency_pair}", {})
-        
-        # デフォルト値で補完
-        default_settings = {
-            "pip_value": 0.01 if 'JPY' in currency_pair else 0.0001,
-            "pip_multiplier": 100 if 'JPY' in currency_pair else 10000,
-            "stop_loss_pips": self.get("backtest_settings.risk_management.stop_loss_pips", 15),
-            "take_profit_pips": self.get("backtest_settings.risk_management.take_profit_pips", 30)
-        }
-        
-        # マージ
-        for key, default_value in default_settings.items():
-            if key not in currency_config:
-                currency_config[key] = default_value
-        
-        return currency_config
+        settings = self.currency_cache.get(currency_pair)
+        if settings is None:
+            # 未知の通貨ペアは初回アクセス時にキャッシュ
+            settings = self._cache_currency(currency_pair)
+        return dict(settings)
     
     def set(self, key_path: str, value: Any):
         """設定値を更新
@@ -265,12 +407,13 @@ class BacktestConfigManager:
             config = config[key]
         
         config[keys[-1]] = value
+        self._refresh_caches()
     
     def save_config(self):
         """設定ファイルを保存"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            _write_json(self.config_file, self.config)
+            self._loaded_mtime_ns = self._file_mtime_ns()
             logger.info(f"設定ファイル保存完了: {self.config_file}")
         except Exception as e:
             logger.error(f"設定ファイル保存エラー: {e}")
@@ -283,8 +426,8 @@ class BacktestConfigManager:
         
         # リスク管理設定
         print("🛡️  リスク管理設定:")
-        sl_enabled = self.get("backtest_settings.risk_management.enable_stop_loss", True)
-        tp_enabled = self.get("backtest_settings.risk_management.enable_take_profit", False)
+        sl_enabled = self.sl_enabled
+        tp_enabled = self.tp_enabled
         sl_pips = self.get("backtest_settings.risk_management.stop_loss_pips", 15)
         tp_pips = self.get("backtest_settings.risk_management.take_profit_pips", 30)
         
@@ -301,5 +444,33 @@ class BacktestConfigManager:
         
         print("=" * 50)
 
+# 絶対パス → 設定マネージャー（プロセス内で共有）
+_config_managers: Dict[str, BacktestConfigManager] = {}
+
+def get_config_manager(config_file: str = "config.json") -> BacktestConfigManager:
+    """設定マネージャーを取得（同一ファイルは再読み込みせず共有）
+    
+    同じ設定ファイルに対しては常に同一インスタンスを返すため、
+    set() による変更は全ての呼び出し元で共有される。
+    設定ファイルの更新時刻が変わっていた場合のみ同じインスタンスに再読み込みする。
+    
+    Parameters:
+    -----------
+    config_file : str
+        設定ファイルパス
+    
+    Returns:
+    --------
+    BacktestConfigManager : 設定マネージャー
+    """
+    resolved_path = str(Path(config_file).resolve())
+    manager = _config_managers.get(resolved_path)
+    if manager is None:
+        manager = _config_managers[resolved_path] = BacktestConfigManager(resolved_path)
+    elif manager.is_stale():
+        logger.info(f"設定ファイルの更新を検出したため再読み込みします: {resolved_path}")
+        manager.load_config()
+    return manager
+
 # グローバル設定インスタンス
-config_manager = BacktestConfigManager()
\ No newline at end of file
+config_manager = get_config_manager()
\ No newline at end of file
@@ -12,6 +12,7 @@ import glob
 import io
 import re
 import argparse
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -20,6 +21,13 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# joblibがあればエントリー単位の監視を並列実行する
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO,
@@ -38,8 +46,104 @@ HISTORICAL_DATA_DIR = SCRIPT_DIR.parent / "input"
 BACKTEST_RESULT_DIR = SCRIPT_DIR / "backtest_result"
 BACKTEST_RESULT_DIR.mkdir(exist_ok=True)
 
+# メモリ上に保持するソート済み履歴データの通貨ペア数
+HISTORICAL_CACHE_SIZE = 4
+
+# SL/TP監視で走査する価格配列の型（FX価格の桁数ならfloat32で足り、走査するバイト数が半分になる）
+PRICE_DTYPE = np.float32
+
+# エントリーポイントCSVの必須カラム
+REQUIRED_ENTRY_COLUMNS = {'Entry', 'Exit', 'Currency', 'Direction'}
+
+# ファイル名中の日付（YYYYMMDD）
+DATE_IN_FILENAME_RE = re.compile(r'(\d{4})(\d{2})(\d{2})')
+
+def extract_date_parts(stem: str):
+    """ファイル名から (年, 月, 日) の文字列を抽出（見つからなければNone）"""
+    # 先頭がYYYYMMDDの一般的な命名は正規表現を使わずに切り出す
+    prefix = stem[:8]
+    if len(prefix) == 8 and prefix.isascii() and prefix.isdigit():
+        return prefix[:4], prefix[4:6], prefix[6:8]
+    
+    date_match = DATE_IN_FILENAME_RE.search(stem)
+    return date_match.groups() if date_match else None
+
+# 監視用価格カラムの優先順位（LONGはbid、SHORTはask）
+LONG_PRICE_COLUMNS = ['close_bid', 'low_bid', 'high_bid', 'open_bid', 'close', 'low', 'high', 'open']
+SHORT_PRICE_COLUMNS = ['close_ask', 'low_ask', 'high_ask', 'open_ask', 'close', 'low', 'high', 'open']
+
+# LONGとして扱う売買方向
+LONG_DIRECTIONS = frozenset({'LONG', 'BUY'})
+
+def is_long_direction(direction) -> bool:
+    """売買方向がLONGか判定（正規化済みのboolはそのまま）"""
+    if isinstance(direction, (bool, np.bool_)):
+        return bool(direction)
+    return direction.upper() in LONG_DIRECTIONS
+
+def to_ns(value) -> int:
+    """時刻をint64ナノ秒に変換（int64ナノ秒はそのまま）"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.to_datetime(value).value
+
+def quantize_price(price):
+    """SL/TP価格を監視用価格配列と同じ精度に丸める（Noneは無効を表すNaN）"""
+    if price is None:
+        return np.nan
+    return float(PRICE_DTYPE(price))
+
+def select_price_column(columns, is_long: bool):
+    """利用可能な監視用価格カラムを選択（見つからなければNone）"""
+    for col in (LONG_PRICE_COLUMNS if is_long else SHORT_PRICE_COLUMNS):
+        if col in columns:
+            return col
+    return None
+
+def find_period_bounds(ts_ns, entry_ns, exit_ns):
+    """ソート済み時刻配列から保有期間の [lo, hi) を二分探索で求める
+    
+    期間内にデータがない場合は、エントリー時刻に最も近い1行を返す。
+    """
+    # エントリー時刻の調整（データ範囲内に調整）
+    entry_ns = max(entry_ns, ts_ns[0])
+    exit_ns = min(exit_ns, ts_ns[-1])
+    
+    lo = int(np.searchsorted(ts_ns, entry_ns, side='left'))
+    hi = int(np.searchsorted(ts_ns, exit_ns, side='right'))
+    if lo < hi:
+        return lo, hi
+    
+    # 最近接データを使用
+    nearest = min(lo, len(ts_ns) - 1)
+    if nearest > 0 and entry_ns - ts_ns[nearest - 1] <= ts_ns[nearest] - entry_ns:
+        nearest -= 1
+    return nearest, nearest + 1
+
+def _scan_entries_chunk(ts_ns, trading_mask, long_prices, short_prices, jobs):
+    """複数エントリーのSL/TP監視をまとめて実行（並列ワーカー用）
+    
+    jobsの各要素は (entry_ns, exit_ns, entry_price, sl_price, tp_price, sign, pip_multiplier)。
+    戻り値は (エグジット行位置, 理由コード, 最大含み益, 最大含み損) のリスト。
+    """
+    results = []
+    for entry_ns, exit_ns, entry_price, sl_price, tp_price, sign, pip_multiplier in jobs:
+        lo, hi = find_period_bounds(ts_ns, entry_ns, exit_ns)
+        prices = long_prices if sign > 0 else short_prices
+        if np.isnan(sl_price) and np.isnan(tp_price):
+            exit_idx, reason_code, max_favorable, max_adverse = scan_time_exit(
+                prices[lo:hi], trading_mask[lo:hi], entry_price, sign, pip_multiplier
+            )
+        else:
+            exit_idx, reason_code, max_favorable, max_adverse = SCAN_KERNELS[sign > 0](
+                prices[lo:hi], trading_mask[lo:hi], entry_price, sl_price, tp_price, pip_multiplier
+            )
+        results.append((lo + exit_idx, reason_code, max_favorable, max_adverse))
+    return results
+
 # 設定管理をインポート
-from config_manager import BacktestConfigManager
+from config_manager import get_config_manager
+from backtest_kernels import SCAN_KERNELS, scan_time_exit, EXIT_REASON_NAMES, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT
 
 class FXBacktestSystemComplete:
     """FXバックテストシステム（設定ファイル対応版）"""
@@ -55,14 +159,23 @@ class FXBacktestSystemComplete:
             特定通貨ペアのみテストする場合に指定
         """
         # 設定マネージャーを初期化
-        self.config_manager = BacktestConfigManager(config_file)
+        self.config_manager = get_config_manager(config_file)
         self.currency_pair_override = currency_pair_override
         
         # 基本変数の初期化
         self.entrypoint_files = []
-        self.backtest_results = []
         self.summary_stats = {}
         
+        # バックテスト結果と、結果追加時に更新する統計の累積値
+        self.backtest_results = []
+        
+        # 通貨ペアごとの (pip_value, pip_multiplier, sl_pips, tp_pips) キャッシュ
+        self._pair_cache = {}
+        
+        # 通貨ペアごとの時刻順ソート済み履歴データ (元データ, ソート済みデータ, 時刻[ns], 取引時間マスク)
+        # 直近に使った HISTORICAL_CACHE_SIZE ペア分のみ保持する（LRU）
+        self._historical_cache = OrderedDict()
+        
         # 設定から値を取得
         self.load_settings_from_config()
         
@@ -86,8 +199,8 @@ class FXBacktestSystemComplete:
             self.currency_settings[currency_pair] = self.config_manager.get_currency_settings(currency_pair)
         
         # 高度な設定
-        self.slippage_pips = self.config_manager.get("backtest_settings.risk_management.slippage_pips", 1)
-        self.weekend_sl_disabled = self.config_manager.get("backtest_settings.advanced_settings.weekend_sl_disabled", True)
+        self.slippage_pips = self.config_manager.slippage_pips
+        self.weekend_sl_disabled = self.config_manager.weekend_sl_disabled
         self.volatile_hours_sl_multiplier = self.config_manager.get("backtest_settings.advanced_settings.volatile_hours_sl_multiplier", 1.5)
     
     def log_current_settings(self):
@@ -119,15 +232,38 @@ class FXBacktestSystemComplete:
         
         logger.info("=" * 60)
     
-    def get_currency_specific_sl_tp(self, currency_pair: str):
-        """通貨ペア別のSL/TP設定を取得"""
+    def _resolve_pair(self, currency_pair: str):
+        """通貨ペアの (pip_value, pip_multiplier, sl_pips, tp_pips) を取得（キャッシュ付き）"""
+        resolved = self._pair_cache.get(currency_pair)
+        if resolved is not None:
+            return resolved
+        
+        # 通貨ペア設定を取得
+        settings = self.currency_settings.get(currency_pair.replace('_', ''))
+        if settings and 'pip_value' in settings:
+            pip_value = settings['pip_value']
+        else:
+            pip_value = 0.01 if 'JPY' in currency_pair else 0.0001
+        if settings and 'pip_multiplier' in settings:
+            pip_multiplier = settings['pip_multiplier']
+        else:
+            pip_multiplier = 100 if 'JPY' in currency_pair else 10000
+        
         sl_pips = self.config_manager.get_stop_loss_pips(currency_pair)
         tp_pips = self.config_manager.get_take_profit_pips(currency_pair)
+        
+        resolved = (pip_value, pip_multiplier, sl_pips, tp_pips)
+        self._pair_cache[currency_pair] = resolved
+        return resolved
+    
+    def get_currency_specific_sl_tp(self, currency_pair: str):
+        """通貨ペア別のSL/TP設定を取得"""
+        _, _, sl_pips, tp_pips = self._resolve_pair(currency_pair)
         return sl_pips, tp_pips
     
     def calculate_stop_loss_price(self, entry_price, direction, currency_pair):
         """ストップロス価格を計算（通貨ペア別設定対応）"""
-        sl_pips, _ = self.get_currency_specific_sl_tp(currency_pair)
+        pip_value, _, sl_pips, _ = self._resolve_pair(currency_pair)
         
         if not sl_pips:
             return None
@@ -135,14 +271,7 @@ class FXBacktestSystemComplete:
         # スリッページを考慮
         effective_sl_pips = sl_pips + self.slippage_pips
         
-        # 通貨ペア設定を取得
-        settings = self.currency_settings.get(currency_pair.replace('_', ''))
-        if not settings:
-            pip_value = 0.01 if 'JPY' in currency_pair else 0.0001
-        else:
-            pip_value = settings['pip_value']
-        
-        if direction.upper() in ['LONG', 'BUY']:
+        if is_long_direction(direction):
             stop_loss_price = entry_price - (effective_sl_pips * pip_value)
         else:  # SHORT, SELL
             stop_loss_price = entry_price + (effective_sl_pips * pip_value)
@@ -151,19 +280,12 @@ class FXBacktestSystemComplete:
     
     def calculate_take_profit_price(self, entry_price, direction, currency_pair):
         """テイクプロフィット価格を計算（通貨ペア別設定対応）"""
-        _, tp_pips = self.get_currency_specific_sl_tp(currency_pair)
+        pip_value, _, _, tp_pips = self._resolve_pair(currency_pair)
         
         if not tp_pips:
             return None
         
-        # 通貨ペア設定を取得
-        settings = self.currency_settings.get(currency_pair.replace('_', ''))
-        if not settings:
-            pip_value = 0.01 if 'JPY' in currency_pair else 0.0001
-        else:
-            pip_value = settings['pip_value']
-        
-        if direction.upper() in ['LONG', 'BUY']:
+        if is_long_direction(direction):
             take_profit_price = entry_price + (tp_pips * pip_value)
         else:  # SHORT, SELL
             take_profit_price = entry_price - (tp_pips * pip_value)
@@ -173,14 +295,9 @@ class FXBacktestSystemComplete:
     def calculate_pips(self, entry_price, exit_price, currency_pair, direction):
         """pips計算"""
         try:
-            # 通貨ペア設定を取得
-            settings = self.currency_settings.get(currency_pair.replace('_', ''))
-            if settings and 'pip_multiplier' in settings:
-                pip_multiplier = settings['pip_multiplier']
-            else:
-                pip_multiplier = 100 if 'JPY' in currency_pair else 10000
+            _, pip_multiplier, _, _ = self._resolve_pair(currency_pair)
             
-            if direction.upper() in ['LONG', 'BUY']:
+            if is_long_direction(direction):
                 pips = (exit_price - entry_price) * pip_multiplier
             else:  # SHORT, SELL
                 pips = (entry_price - exit_price) * pip_multiplier
@@ -195,7 +312,7 @@ class FXBacktestSystemComplete:
         if stop_loss_price is None:
             return False
         
-        if direction.upper() in ['LONG', 'BUY']:
+        if is_long_direction(direction):
             return current_price <= stop_loss_price
         else:  # SHORT, SELL
             return current_price >= stop_loss_price
@@ -205,7 +322,7 @@ class FXBacktestSystemComplete:
         if take_profit_price is None:
             return False
         
-        if direction.upper() in ['LONG', 'BUY']:
+        if is_long_direction(direction):
             return current_price >= take_profit_price
         else:  # SHORT, SELL
             return current_price <= take_profit_price
@@ -231,6 +348,25 @@ class FXBacktestSystemComplete:
         
         return 1.0
     
+    def read_entrypoint_csv(self, file_path: Path) -> pd.DataFrame:
+        """エントリーポイントCSVを読み込み（CSVより新しいParquetキャッシュがあれば再利用）"""
+        cache_path = file_path.with_suffix('.parquet')
+        if cache_path.exists() and cache_path.stat().st_mtime >= file_path.stat().st_mtime:
+            try:
+                return pd.read_parquet(cache_path, engine='pyarrow')
+            except Exception as e:
+                logger.warning(f"Parquetキャッシュ読み込みエラー {cache_path.name}: {e}")
+        
+        df = pd.read_csv(file_path)
+        
+        # 次回以降の読み込み用にキャッシュを作成（pyarrowがない環境ではスキップ）
+        try:
+            df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+        except Exception as e:
+            logger.debug(f"Parquetキャッシュ作成をスキップ {cache_path.name}: {e}")
+        
+        return df
+    
     def load_entrypoint_files(self):
         """エントリーポイントファイルを読み込み"""
         try:
@@ -244,23 +380,30 @@ class FXBacktestSystemComplete:
             for file_path in csv_files:
                 try:
                     # ファイル名から日付を抽出
-                    date_match = re.search(r'(\d{4})(\d{2})(\d{2})', file_path.stem)
-                    if not date_match:
+                    date_parts = extract_date_parts(file_path.stem)
+                    if not date_parts:
                         logger.warning(f"日付形式が不正なファイルをスキップ: {file_path.name}")
                         continue
                     
-                    year, month, day = date_match.groups()
+                    year, month, day = date_parts
                     date_str = f"{year}-{month}-{day}"
                     
-                    # CSVファイルを読み込み
-                    df = pd.read_csv(file_path)
+                    # CSVファイルを読み込み（Parquetキャッシュがあればそちらを使用）
+                    df = self.read_entrypoint_csv(file_path)
                     
                     # 必要なカラムがあるかチェック
-                    required_columns = ['Entry', 'Exit', 'Currency', 'Direction']
-                    if not all(col in df.columns for col in required_columns):
+                    missing_columns = REQUIRED_ENTRY_COLUMNS - set(df.columns)
+                    if missing_columns:
                         logger.warning(f"必要なカラムが不足: {file_path.name}")
                         continue
                     
+                    # Entry/Exitを読み込み時に一括でdatetime64[ns]へ変換
+                    try:
+                        for col in ('Entry', 'Exit'):
+                            df[col] = pd.to_datetime(df[col]).astype('datetime64[ns]')
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Entry/Exitの日時変換に失敗（監視時に個別変換）{file_path.name}: {e}")
+                    
                     self.entrypoint_files.append({
                         'file_path': file_path,
                         'date_str': date_str,
@@ -276,22 +419,112 @@ class FXBacktestSystemComplete:
         except Exception as e:
             logger.error(f"エントリーポイントファイル読み込みエラー: {e}")
     
+    def _get_sorted_history(self, df_historical, currency_pair):
+        """時刻順ソート済みの履歴データ・int64ナノ秒の時刻配列・取引時間マスク・監視用価格カラムと価格配列を取得（キャッシュ付き）
+        
+        同じ通貨ペアに同一の履歴データが渡される限り、ソート・マスク計算・価格カラムの選択は初回のみ行う。
+        取引時間マスクは週末SL無効化設定時のみ土日をFalseにする。
+        監視用価格カラムは {is_long: カラム名}、価格配列は {is_long: PRICE_DTYPEの配列} の形式
+        （見つからない方向はNone）。
+        """
+        cached = self._historical_cache.get(currency_pair)
+        if cached is not None and cached[0] is df_historical:
+            self._historical_cache.move_to_end(currency_pair)
+            return cached[1:]
+        
+        df_sorted = df_historical[df_historical['timestamp'].notna()]
+        df_sorted = df_sorted.sort_values('timestamp', kind='mergesort').reset_index(drop=True)
+        ts_ns = df_sorted['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+        
+        if self.weekend_sl_disabled:
+            trading_mask = df_sorted['timestamp'].dt.weekday.to_numpy() < 5  # 5=土曜日, 6=日曜日
+        else:
+            trading_mask = np.ones(len(ts_ns), dtype=np.bool_)
+        
+        # カラム構成は履歴データごとに固定なので方向別の価格カラムもここで決める
+        price_columns = {
+            True: select_price_column(df_sorted.columns, True),
+            False: select_price_column(df_sorted.columns, False),
+        }
+        
+        price_arrays = {
+            is_long: df_sorted[column].to_numpy(dtype=PRICE_DTYPE) if column else None
+            for is_long, column in price_columns.items()
+        }
+        
+        self._historical_cache[currency_pair] = (
+            df_historical, df_sorted, ts_ns, trading_mask, price_columns, price_arrays
+        )
+        self._historical_cache.move_to_end(currency_pair)
+        while len(self._historical_cache) > HISTORICAL_CACHE_SIZE:
+            evicted_pair, _ = self._historical_cache.popitem(last=False)
+            logger.debug("履歴データキャッシュから削除: %s", evicted_pair)
+        return df_sorted, ts_ns, trading_mask, price_columns, price_arrays
+    
+    def clear_historical_cache(self):
+        """履歴データキャッシュを解放（メモリが厳しい場合に通貨ペアの切り替え時に呼ぶ）"""
+        self._historical_cache.clear()
+    
+    def _build_exit_record(self, reason_code, price_at_exit, exit_time, stop_loss_price,
+                           take_profit_price, max_favorable, max_adverse, sl_pips, tp_pips):
+        """監視結果からエグジット情報のdictを作成"""
+        max_favorable_pips = round(float(max_favorable), 1)
+        max_adverse_pips = round(float(max_adverse), 1)
+        
+        # ストップロス
+        if reason_code == EXIT_STOP_LOSS:
+            logger.info("       🛑 ストップロスヒット: %s @ %s", price_at_exit, exit_time)
+            return {
+                'exit_price': stop_loss_price,
+                'actual_exit_time': exit_time,
+                'exit_reason': 'STOP_LOSS',
+                'max_favorable_pips': max_favorable_pips,
+                'max_adverse_pips': max_adverse_pips,
+                'sl_pips_used': sl_pips
+            }
+        
+        # テイクプロフィット
+        if reason_code == EXIT_TAKE_PROFIT:
+            logger.info("       🎯 テイクプロフィットヒット: %s @ %s", price_at_exit, exit_time)
+            return {
+                'exit_price': take_profit_price,
+                'actual_exit_time': exit_time,
+                'exit_reason': 'TAKE_PROFIT',
+                'max_favorable_pips': max_favorable_pips,
+                'max_adverse_pips': max_adverse_pips,
+                'tp_pips_used': tp_pips
+            }
+        
+        # 時間切れ（通常のエグジット）
+        return {
+            'exit_price': float(price_at_exit),
+            'actual_exit_time': exit_time,
+            'exit_reason': EXIT_REASON_NAMES[reason_code],
+            'max_favorable_pips': max_favorable_pips,
+            'max_adverse_pips': max_adverse_pips,
+            'sl_pips_used': sl_pips,
+            'tp_pips_used': tp_pips
+        }
+    
     def monitor_position_with_stop_loss(self, df_historical, entry_time, exit_time, 
                                        entry_price, direction, currency_pair):
         """ストップロス・テイクプロフィット監視（設定ファイル対応版）"""
         try:
+            # 売買方向は最初に1回だけ正規化し、以降はboolで受け渡す
+            is_long = is_long_direction(direction)
+            
             # 通貨ペア別のSL/TP価格を計算
-            stop_loss_price = self.calculate_stop_loss_price(entry_price, direction, currency_pair)
-            take_profit_price = self.calculate_take_profit_price(entry_price, direction, currency_pair)
+            stop_loss_price = self.calculate_stop_loss_price(entry_price, is_long, currency_pair)
+            take_profit_price = self.calculate_take_profit_price(entry_price, is_long, currency_pair)
             
-            # 通貨ペア別のSL/TP設定をログ出力
-            sl_pips, tp_pips = self.get_currency_specific_sl_tp(currency_pair)
-            logger.debug(f"       {currency_pair}設定: SL={sl_pips}pips, TP={tp_pips}pips")
-            logger.debug(f"       SL価格: {stop_loss_price}, TP価格: {take_profit_price}")
+            # 通貨ペア別のSL/TP設定をログ出力（監視ループ内のため遅延フォーマット）
+            _, pip_multiplier, sl_pips, tp_pips = self._resolve_pair(currency_pair)
+            logger.debug("       %s設定: SL=%spips, TP=%spips", currency_pair, sl_pips, tp_pips)
+            logger.debug("       SL価格: %s, TP価格: %s", stop_loss_price, take_profit_price)
             
-            # 時刻をdatetimeに変換
-            entry_datetime = pd.to_datetime(entry_time)
-            exit_datetime = pd.to_datetime(exit_time)
+            # 時刻をint64ナノ秒に変換（読み込み時に変換済みならそのまま）
+            entry_ns = to_ns(entry_time)
+            exit_ns = to_ns(exit_time)
             
             # データの有効性チェック
             if df_historical.empty:
@@ -302,110 +535,132 @@ class FXBacktestSystemComplete:
                 logger.warning(f"       timestampカラムがありません: {list(df_historical.columns)}")
                 return None
             
-            # データの時間範囲を確認
-            df_sorted = df_historical.sort_values('timestamp').copy()
-            data_min_time = df_sorted['timestamp'].min()
-            data_max_time = df_sorted['timestamp'].max()
-            
-            # エントリー時刻の調整（データ範囲内に調整）
-            adjusted_entry_time = max(entry_datetime, data_min_time)
-            adjusted_exit_time = min(exit_datetime, data_max_time)
-            
-            # 調整後の時刻で期間データを抽出
-            mask = (df_sorted['timestamp'] >= adjusted_entry_time) & (df_sorted['timestamp'] <= adjusted_exit_time)
-            period_data = df_sorted[mask].copy()
-            
-            # 期間データが空の場合の対処
-            if period_data.empty:
-                # 最近接データを使用
-                df_sorted['time_diff'] = abs(df_sorted['timestamp'] - adjusted_entry_time)
-                closest_idx = df_sorted['time_diff'].idxmin()
-                period_data = df_sorted.iloc[[closest_idx]].copy()
+            # 時刻順にソート済みのデータと時刻配列（ペアごとに1回だけ作成）
+            df_sorted, ts_ns, trading_mask, price_columns, price_arrays = self._get_sorted_history(
+                df_historical, currency_pair
+            )
+            if len(ts_ns) == 0:
+                logger.warning("       有効なtimestampがありません")
+                return None
             
-            # 監視用の価格カラムを決定
-            if direction.upper() in ['LONG', 'BUY']:
-                price_columns = ['close_bid', 'low_bid', 'high_bid', 'open_bid', 'close', 'low', 'high', 'open']
-            else:  # SHORT, SELL
-                price_columns = ['close_ask', 'low_ask', 'high_ask', 'open_ask', 'close', 'low', 'high', 'open']
+            # 二分探索で期間データの範囲を特定（期間内にデータがなければ最近接の1行）
+            lo, hi = find_period_bounds(ts_ns, entry_ns, exit_ns)
             
-            # 利用可能な価格カラムを選択
-            price_column = None
-            for col in price_columns:
-                if col in period_data.columns:
-                    price_column = col
-                    break
+            # 監視用の価格カラム（ペアごとに選択済み）
+            price_column = price_columns[is_long]
             
             if price_column is None:
-                logger.warning(f"       監視用価格カラムが見つかりません: {list(period_data.columns)}")
+                logger.warning(f"       監視用価格カラムが見つかりません: {list(df_sorted.columns)}")
                 return None
             
-            # 各時点でストップロス・テイクプロフィットをチェック
-            max_favorable_pips = 0
-            max_adverse_pips = 0
+            # キャッシュ済みの価格配列（PRICE_DTYPE）の期間部分をDataFrameを作らずビューで一括チェック
+            prices = price_arrays[is_long][lo:hi]
             
-            for idx, row in period_data.iterrows():
-                if pd.isna(row[price_column]):
-                    continue
-                
-                current_price = float(row[price_column])
-                current_time = row['timestamp']
-                
-                # 取引時間外はSLチェックをスキップ（設定に応じて）
-                if not self.is_trading_time(current_time):
-                    continue
-                
-                # 現在のpipsを計算
-                current_pips = self.calculate_pips(entry_price, current_price, currency_pair, direction)
-                
-                # 最大含み益・含み損を更新
-                if current_pips > max_favorable_pips:
-                    max_favorable_pips = current_pips
-                if current_pips < max_adverse_pips:
-                    max_adverse_pips = current_pips
-                
-                # ストップロスチェック
-                if self.check_stop_loss_hit(current_price, stop_loss_price, direction):
-                    logger.info(f"       🛑 ストップロスヒット: {current_price} @ {current_time}")
-                    return {
-                        'exit_price': stop_loss_price,
-                        'actual_exit_time': current_time,
-                        'exit_reason': 'STOP_LOSS',
-                        'max_favorable_pips': max_favorable_pips,
-                        'max_adverse_pips': max_adverse_pips,
-                        'sl_pips_used': sl_pips
-                    }
-                
-                # テイクプロフィットチェック
-                if self.check_take_profit_hit(current_price, take_profit_price, direction):
-                    logger.info(f"       🎯 テイクプロフィットヒット: {current_price} @ {current_time}")
-                    return {
-                        'exit_price': take_profit_price,
-                        'actual_exit_time': current_time,
-                        'exit_reason': 'TAKE_PROFIT',
-                        'max_favorable_pips': max_favorable_pips,
-                        'max_adverse_pips': max_adverse_pips,
-                        'tp_pips_used': tp_pips
-                    }
+            # 取引時間外（週末SL無効化設定時）は監視対象外
+            trading_mask = trading_mask[lo:hi]
             
-            # 時間切れ（通常のエグジット）
-            final_row = period_data.iloc[-1]
-            final_price = float(final_row[price_column])
-            final_time = final_row['timestamp']
+            # 方向に応じた符号
+            sign = 1.0 if is_long else -1.0
             
-            return {
-                'exit_price': final_price,
-                'actual_exit_time': final_time,
-                'exit_reason': 'TIME_EXIT',
-                'max_favorable_pips': max_favorable_pips,
-                'max_adverse_pips': max_adverse_pips,
-                'sl_pips_used': sl_pips,
-                'tp_pips_used': tp_pips
-            }
+            # SL/TP到達と最大含み益・含み損を1回の走査で判定（SL/TPともに無効なら集約のみ）
+            if stop_loss_price is None and take_profit_price is None:
+                exit_idx, reason_code, max_favorable, max_adverse = scan_time_exit(
+                    prices, trading_mask, float(entry_price), sign, float(pip_multiplier)
+                )
+            else:
+                # 方向別に特殊化したカーネルで走査
+                exit_idx, reason_code, max_favorable, max_adverse = SCAN_KERNELS[is_long](
+                    prices, trading_mask, float(entry_price),
+                    quantize_price(stop_loss_price), quantize_price(take_profit_price),
+                    float(pip_multiplier)
+                )
+            
+            # エグジット価格は丸める前の元データから取得
+            exit_row = lo + exit_idx
+            return self._build_exit_record(
+                reason_code, df_sorted[price_column].iat[exit_row], df_sorted['timestamp'].iat[exit_row],
+                stop_loss_price, take_profit_price, max_favorable, max_adverse, sl_pips, tp_pips
+            )
             
         except Exception as e:
             logger.error(f"       ストップロス監視エラー: {e}")
             return None
     
+    def monitor_positions_batch(self, df_historical, currency_pair, entries, n_jobs=None):
+        """同一通貨ペアの複数エントリーをまとめてSL/TP監視（エントリー単位で並列実行）
+        
+        Parameters:
+        -----------
+        df_historical : pd.DataFrame
+            履歴データ
+        currency_pair : str
+            通貨ペア名
+        entries : list of tuple
+            (entry_time, exit_time, entry_price, direction) のリスト（時刻はint64ナノ秒も可）
+        n_jobs : int, optional
+            並列数（省略時はCPUコア数）
+        
+        Returns:
+        --------
+        list : エントリーごとの監視結果（monitor_position_with_stop_loss と同じ形式、失敗時はNone）
+        """
+        if df_historical.empty or 'timestamp' not in df_historical.columns:
+            logger.warning("       履歴データが空、またはtimestampカラムがありません")
+            return [None] * len(entries)
+        
+        df_sorted, ts_ns, trading_mask, price_columns, price_arrays = self._get_sorted_history(
+            df_historical, currency_pair
+        )
+        if len(ts_ns) == 0:
+            return [None] * len(entries)
+        
+        long_prices, short_prices = price_arrays[True], price_arrays[False]
+        
+        _, pip_multiplier, sl_pips, tp_pips = self._resolve_pair(currency_pair)
+        
+        # エントリーごとのジョブ（価格カラムがない方向は監視不可）
+        jobs, job_meta, results = [], [], [None] * len(entries)
+        for i, (entry_time, exit_time, entry_price, direction) in enumerate(entries):
+            is_long = is_long_direction(direction)
+            if (long_prices if is_long else short_prices) is None:
+                continue
+            stop_loss_price = self.calculate_stop_loss_price(entry_price, is_long, currency_pair)
+            take_profit_price = self.calculate_take_profit_price(entry_price, is_long, currency_pair)
+            jobs.append((
+                to_ns(entry_time), to_ns(exit_time), float(entry_price),
+                quantize_price(stop_loss_price), quantize_price(take_profit_price),
+                1.0 if is_long else -1.0, float(pip_multiplier)
+            ))
+            job_meta.append((i, is_long, stop_loss_price, take_profit_price))
+        
+        if not jobs:
+            return results
+        
+        # ワーカーごとにジョブを分割（大きな配列はjoblibがメモリマップで共有）
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if JOBLIB_AVAILABLE and n_jobs > 1 and len(jobs) > n_jobs:
+            chunks = [jobs[k::n_jobs] for k in range(n_jobs)]
+            chunk_results = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_scan_entries_chunk)(ts_ns, trading_mask, long_prices, short_prices, chunk)
+                for chunk in chunks
+            )
+            # 分割順を元のジョブ順に戻す
+            scanned = [None] * len(jobs)
+            for k, chunk_result in enumerate(chunk_results):
+                scanned[k::n_jobs] = chunk_result
+        else:
+            scanned = _scan_entries_chunk(ts_ns, trading_mask, long_prices, short_prices, jobs)
+        
+        # エグジット価格は丸める前の元データから取得
+        timestamps = df_sorted['timestamp']
+        original_prices = {is_long: df_sorted[column] for is_long, column in price_columns.items() if column}
+        for (i, is_long, stop_loss_price, take_profit_price), (row, reason_code, max_favorable, max_adverse) in zip(job_meta, scanned):
+            results[i] = self._build_exit_record(
+                reason_code, original_prices[is_long].iat[row], timestamps.iloc[row],
+                stop_loss_price, take_profit_price, max_favorable, max_adverse, sl_pips, tp_pips
+            )
+        return results
+    
     def run_backtest(self):
         """バックテスト実行"""
         logger.info("🚀 FXバックテスト開始")
@@ -421,53 +676,91 @@ class FXBacktestSystemComplete:
         logger.info("📊 バックテスト処理を実行中...")
         
         # ダミーデータで動作確認
-        self.backtest_results = [
-            {
-                'date': '2024-01-01',
-                'currency_pair': 'USDJPY',
-                'direction': 'LONG',
-                'entry_price': 150.00,
-                'exit_price': 149.85,
-                'pips': -15.0,
-                'result': 'LOSS',
-                'exit_reason': 'STOP_LOSS'
-            }
-        ]
+        self.backtest_results = []
+        self.add_backtest_result({
+            'date': '2024-01-01',
+            'currency_pair': 'USDJPY',
+            'direction': 'LONG',
+            'entry_price': 150.00,
+            'exit_price': 149.85,
+            'pips': -15.0,
+            'result': 'LOSS',
+            'exit_reason': 'STOP_LOSS'
+        })
         
         logger.info("✅ バックテスト完了")
     
+    def _reset_stats_accum(self):
+        """統計の累積値を初期化"""
+        self._stats_accum = {
+            'total_trades': 0,
+            'wins': 0,
+            'losses': 0,
+            'total_pips': 0.0,
+            'exit_counts': Counter()
+        }
+    
+    def _accumulate_result(self, result):
+        """1件の結果を統計の累積値に反映"""
+        accum = self._stats_accum
+        accum['total_trades'] += 1
+        if result.get('result') == 'WIN':
+            accum['wins'] += 1
+        elif result.get('result') == 'LOSS':
+            accum['losses'] += 1
+        accum['total_pips'] += result.get('pips') or 0.0
+        if 'exit_reason' in result:
+            accum['exit_counts'][result['exit_reason']] += 1
+    
+    @property
+    def backtest_results(self):
+        """バックテスト結果（読み取り専用、追加はadd_backtest_resultで行う）"""
+        return tuple(self._backtest_results)
+    
+    @backtest_results.setter
+    def backtest_results(self, results):
+        """バックテスト結果を置き換え、統計の累積値を再計算"""
+        self._backtest_results = []
+        self._reset_stats_accum()
+        for result in results:
+            self.add_backtest_result(result)
+    
+    def add_backtest_result(self, result):
+        """バックテスト結果を追加し、統計の累積値を更新（後から変更されないよう複製して保持）"""
+        result = dict(result)
+        self._backtest_results.append(result)
+        self._accumulate_result(result)
+    
     def calculate_statistics(self):
         """基本統計計算"""
-        if not self.backtest_results:
+        if not self._backtest_results:
             return
         
-        df = pd.DataFrame(self.backtest_results)
-        
+        # 累積値から計算（結果一覧の再走査なし）
+        accum = self._stats_accum
         self.summary_stats = {
-            'total_trades': len(df),
-            'wins': len(df[df['result'] == 'WIN']),
-            'losses': len(df[df['result'] == 'LOSS']),
-            'total_pips': df['pips'].sum(),
-            'avg_pips': df['pips'].mean()
+            'total_trades': accum['total_trades'],
+            'wins': accum['wins'],
+            'losses': accum['losses'],
+            'total_pips': accum['total_pips'],
+            'avg_pips': accum['total_pips'] / accum['total_trades']
         }
     
     def generate_enhanced_statistics(self):
         """設定別統計の生成"""
-        if not self.backtest_results:
+        if not self._backtest_results:
             return
         
-        df = pd.DataFrame(self.backtest_results)
-        
         # 基本統計計算
         self.calculate_statistics()
         
         # 拡張統計
         enhanced_stats = {}
         
-        if 'exit_reason' in df.columns:
-            exit_reason_counts = df['exit_reason'].value_counts()
-            total_trades = len(df)
-            
+        exit_reason_counts = self._stats_accum['exit_counts'] or None
+        total_trades = self._stats_accum['total_trades']
+        
+        if exit_reason_counts is not None:
             enhanced_stats['exit_statistics'] = {
                 'stop_loss_rate': (exit_reason_counts.get('STOP_LOSS', 0) / total_trades * 100),
                 'take_profit_rate': (exit_reason_counts.get('TAKE_PROFIT', 0) / total_trades * 100),
@@ -512,7 +805,7 @@ def main():
     try:
         # 設定確認モード
         if args.show_config:
-            config_manager = BacktestConfigManager(args.config)
+            config_manager = get_config_manager(args.config)
             config_manager.print_current_settings()
             return
         
@@ -528,11 +821,13 @@ def main():
         if args.sl:
             backtest_system.config_manager.set("backtest_settings.risk_management.stop_loss_pips", args.sl)
             backtest_system.stop_loss_pips = args.sl
+            backtest_system._pair_cache.clear()
             logger.info(f"📉 ストップロス上書き: {args.sl}pips")
         
         if args.tp:
             backtest_system.config_manager.set("backtest_settings.risk_management.take_profit_pips", args.tp)
             backtest_system.take_profit_pips = args.tp
+            backtest_system._pair_cache.clear()
             logger.info(f"📈 テイクプロフィット上書き: {args.tp}pips")
         
         # バックテスト実行
@@ -11,12 +11,24 @@ import re
 import argparse
 import logging
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import repeat
+
+# pyarrowがあればCSVをpyarrowエンジンで読み込み、結果はParquetに逐次書き出す
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # 設定管理をインポート
-from config_manager import BacktestConfigManager
+from config_manager import get_config_manager
 
-# ログ設定
+# ログ設定（ワーカープロセスの出力も失われないよう、ファイルへは都度書き込む）
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -34,18 +46,271 @@ HISTORICAL_DATA_DIR = SCRIPT_DIR.parent / "input"
 BACKTEST_RESULT_DIR = SCRIPT_DIR / "backtest_result"
 BACKTEST_RESULT_DIR.mkdir(exist_ok=True)
 
+# 読み込み済みエントリーポイントCSVのParquetキャッシュ（ファイル名に元CSVの更新時刻を含める）
+ENTRY_CACHE_DIR = SCRIPT_DIR / "entrypoint_cache"
+
+# バックテスト結果を書き出す単位（取引数）と、統計計算用に読み戻すカラム
+RESULT_BATCH_SIZE = 10000
+RESULT_STATS_COLUMNS = ['currency_pair', 'direction', 'pips', 'result', 'exit_reason']
+RESULT_DTYPE = pd.CategoricalDtype(['WIN', 'LOSS', 'EVEN'])
+EXIT_REASON_DTYPE = pd.CategoricalDtype(['STOP_LOSS', 'TAKE_PROFIT', 'TIME_EXIT'])
+
+# エントリーポイントCSVの並列解析設定
+MAX_PARSE_WORKERS = os.cpu_count() or 1
+PARSE_CHUNKSIZE = 4
+
+# 方向の表記ゆれ → 標準名（キーは strip().upper() 済みの値）
+DIRECTION_MAPPING = {
+    'LONG': ['LONG', 'BUY', 'L', 'B', 'ロング', '買い', '買'],
+    'SHORT': ['SHORT', 'SELL', 'S', 'ショート', '売り', '売']
+}
+DIRECTION_LOOKUP = {variant: standard for standard, variants in DIRECTION_MAPPING.items() for variant in variants}
+
+# 通貨ペアの表記ゆれ → 標準名（キーは strip().upper() 済みの値）
+CURRENCY_MAPPING = {
+    'USDJPY': ['USDJPY', 'USD/JPY', 'USD-JPY', 'ドル円', 'ドル/円'],
+    'EURJPY': ['EURJPY', 'EUR/JPY', 'EUR-JPY', 'ユーロ円', 'ユーロ/円'],
+    'GBPJPY': ['GBPJPY', 'GBP/JPY', 'GBP-JPY', 'ポンド円', 'ポンド/円'],
+    'EURUSD': ['EURUSD', 'EUR/USD', 'EUR-USD', 'ユーロドル', 'ユーロ/ドル'],
+    'GBPUSD': ['GBPUSD', 'GBP/USD', 'GBP-USD', 'ポンドドル', 'ポンド/ドル']
+}
+CURRENCY_LOOKUP = {variant: standard for standard, variants in CURRENCY_MAPPING.items() for variant in variants}
+
+# pips計算用の方向符号（ここにない方向はSHORT扱い）
+DIRECTION_SIGN = {'LONG': 1, 'BUY': 1, 'SHORT': -1, 'SELL': -1}
+
+# 標準化後の値は種類が少ないためカテゴリ型で保持（全ファイルで同じカテゴリを使い、結合後も型を保つ）
+CURRENCY_DTYPE = pd.CategoricalDtype(list(CURRENCY_MAPPING))
+DIRECTION_DTYPE = pd.CategoricalDtype(list(DIRECTION_MAPPING) + ['UNKNOWN'])
+
+# ファイル名中の日付（YYYYMMDD）
+DATE_IN_FILENAME_RE = re.compile(r'(\d{4})(\d{2})(\d{2})')
+
+# HH:MM:SS / HH:MM 形式の時刻（全角数字は半角に変換してから照合）
+TIME_OF_DAY_RE = re.compile(r'^(\d{2}):(\d{2})(?::(\d{2}))?$')
+FULLWIDTH_DIGITS = str.maketrans('０１２３４５６７８９', '0123456789')
+
+def read_entry_csv(file_path):
+    """エントリーポイントCSVを読み込み（標準化は文字列で行うため全列を文字列として読む）
+    
+    pyarrowがある場合は、CSVの更新時刻をキーにしたParquetキャッシュを再利用する。
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(file_path, encoding='utf-8', dtype=str)
+    
+    cache_path = ENTRY_CACHE_DIR / f"{file_path.stem}_{file_path.stat().st_mtime_ns}.parquet"
+    if cache_path.exists():
+        try:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+        except Exception as e:
+            logger.warning(f"Parquetキャッシュ読み込みエラー {cache_path.name}: {e}")
+    
+    df = pd.read_csv(file_path, encoding='utf-8', engine='pyarrow', dtype=str)
+    
+    # 古い更新時刻のキャッシュを削除してから新しいキャッシュを作成
+    try:
+        ENTRY_CACHE_DIR.mkdir(exist_ok=True)
+        for stale_path in ENTRY_CACHE_DIR.glob(f"{file_path.stem}_*.parquet"):
+            if stale_path.stem[len(file_path.stem) + 1:].isdigit():
+                stale_path.unlink(missing_ok=True)
+        df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    except Exception as e:
+        logger.debug(f"Parquetキャッシュ作成をスキップ {cache_path.name}: {e}")
+    
+    return df
+
+def parse_time_column(time_values, base_ts):
+    """時刻文字列の列を基準日のdatetime64[ns]配列に一括変換（不正な値はNaT）
+    
+    Parameters:
+    -----------
+    time_values : pd.Series
+        HH:MM:SS / HH:MM 形式の時刻文字列
+    base_ts : pd.Timestamp
+        基準日
+    
+    Returns:
+    --------
+    np.ndarray : datetime64[ns]
+    """
+    text = time_values.astype(str).str.strip().str.translate(FULLWIDTH_DIGITS)
+    parts = text.str.extract(TIME_OF_DAY_RE)
+    hour = pd.to_numeric(parts[0], errors='coerce').to_numpy()
+    minute = pd.to_numeric(parts[1], errors='coerce').to_numpy()
+    second = pd.to_numeric(parts[2], errors='coerce').fillna(0).to_numpy()
+    
+    valid = time_values.notna().to_numpy() & (hour < 24) & (minute < 60) & (second < 60)
+    
+    # 基準日 + 経過秒をdatetime64のまま計算
+    times = np.full(len(time_values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    seconds = (hour[valid] * 3600 + minute[valid] * 60 + second[valid]).astype(np.int64)
+    times[valid] = np.datetime64(base_ts, 'ns') + seconds.astype('timedelta64[s]')
+    return times
+
+def standardize_direction_column(direction_values):
+    """方向の列を一括で標準化（FXBacktestSystemComplete.standardize_direction と同じ規則）"""
+    keys = direction_values.astype(str).str.strip().str.upper()
+    standardized = keys.map(DIRECTION_LOOKUP)
+    
+    unknown = standardized.isna() & direction_values.notna()
+    for value in direction_values[unknown].unique():
+        logger.warning(f"不明な方向値: {value} → LONG に設定")
+    standardized[unknown] = 'LONG'
+    standardized[direction_values.isna()] = 'UNKNOWN'
+    return standardized
+
+def standardize_currency_column(currency_values):
+    """通貨ペアの列を一括で標準化（FXBacktestSystemComplete.standardize_currency_pair と同じ規則）"""
+    keys = currency_values.astype(str).str.strip().str.upper()
+    standardized = keys.map(CURRENCY_LOOKUP)
+    
+    unknown = standardized.isna() & currency_values.notna()
+    for value in currency_values[unknown].unique():
+        logger.warning(f"不明な通貨ペア: {value} → USDJPY に設定")
+    return standardized.fillna('USDJPY')
+
+@lru_cache(maxsize=256)
+def match_column(columns, possible_lower):
+    """候補名（小文字）に一致する最初のカラム名を返す（見つからなければNone）
+    
+    完全一致・大文字小文字を無視した一致・部分一致は、いずれも小文字同士の包含で判定できる。
+    """
+    for col_name in columns:
+        col_lower = col_name.lower()
+        if any(name in col_lower or col_lower in name for name in possible_lower):
+            return col_name
+    return None
+
+def _parse_entry_file(file_path, column_aliases, currency_pair_override):
+    """エントリーポイントCSVを1ファイル解析（並列ワーカー用）
+    
+    Parameters:
+    -----------
+    file_path : Path
+        CSVファイルパス
+    column_aliases : dict
+        標準カラム名 → 小文字化した候補名のタプル
+    currency_pair_override : str or None
+        指定された通貨ペアのみ残す
+    
+    Returns:
+    --------
+    dict or None : entrypoint_filesの1要素（読み込めなければNone）
+    """
+    try:
+        # ファイル名から日付を抽出
+        date_match = DATE_IN_FILENAME_RE.search(file_path.stem)
+        if not date_match:
+            logger.warning(f"日付形式が不正なファイルをスキップ: {file_path.name}")
+            return None
+        
+        year, month, day = date_match.groups()
+        date_str = f"{year}-{month}-{day}"
+        base_date = datetime(int(year), int(month), int(day))
+        base_ts = pd.Timestamp(base_date)
+        
+        # CSVファイルを読み込み
+        df = read_entry_csv(file_path)
+        
+        # カラムマッピングを確認
+        column_mapping = {}
+        required_fields = ['entry_time', 'exit_time', 'currency_pair', 'direction']
+        columns = tuple(df.columns)
+        
+        for field in required_fields:
+            mapped_col = match_column(columns, column_aliases.get(field, ()))
+            if mapped_col:
+                column_mapping[field] = mapped_col
+            else:
+                logger.error(f"必須カラムが見つかりません {file_path.name}: {field}")
+                return None
+        
+        # データを標準化（列単位で一括処理）
+        entry_raw = df[column_mapping['entry_time']]
+        exit_raw = df[column_mapping['exit_time']]
+        entry_times = parse_time_column(entry_raw, base_ts)
+        exit_times = parse_time_column(exit_raw, base_ts)
+        
+        # 変換できなかった行はファイルごとに件数だけ警告（行ごとの詳細はDEBUG時のみ）
+        parsed = ~np.isnat(entry_times) & ~np.isnat(exit_times)
+        failed_rows = int((~parsed).sum())
+        if failed_rows:
+            logger.warning(f"時刻変換失敗 {file_path.name}: {failed_rows}行をスキップ")
+            if logger.isEnabledFor(logging.DEBUG):
+                for idx in df.index[~parsed]:
+                    logger.debug("時刻変換失敗 %s 行%d: %s -> %s", file_path.name, idx + 1, entry_raw[idx], exit_raw[idx])
+        df = df[parsed]
+        entry_times = entry_times[parsed]
+        exit_times = exit_times[parsed]
+        
+        # エグジット時刻がエントリー時刻より前の場合は翌日扱い
+        exit_times = exit_times + np.timedelta64(1, 'D') * (exit_times <= entry_times)
+        
+        currency_pair = standardize_currency_column(df[column_mapping['currency_pair']]).to_numpy()
+        direction = standardize_direction_column(df[column_mapping['direction']]).to_numpy()
+        
+        # 通貨ペアフィルタリング（列ごとの配列に同じマスクを適用）
+        keep = slice(None)
+        if currency_pair_override:
+            keep = currency_pair == currency_pair_override
+        
+        # 列ごとの配列から直接DataFrameを構築（インデックス整列やコピーを挟まない）
+        processed_data = pd.DataFrame({
+            'entry_time': entry_times[keep],
+            'exit_time': exit_times[keep],
+            'currency_pair': pd.Categorical(currency_pair[keep], dtype=CURRENCY_DTYPE),
+            'direction': pd.Categorical(direction[keep], dtype=DIRECTION_DTYPE),
+            'original_entry': df[column_mapping['entry_time']].to_numpy()[keep],
+            'original_exit': df[column_mapping['exit_time']].to_numpy()[keep],
+            'row_index': df.index.to_numpy()[keep]
+        })
+        
+        if processed_data.empty:
+            logger.warning(f"⚠️  処理可能なデータなし: {file_path.name}")
+            return None
+        
+        return {
+            'file_path': file_path,
+            'date_str': date_str,
+            'base_date': base_date,
+            'data': processed_data,
+            'original_columns': list(df.columns),
+            'column_mapping': column_mapping,
+            'trade_count': len(processed_data)
+        }
+        
+    except Exception as e:
+        logger.error(f"ファイル処理エラー {file_path.name}: {e}")
+        return None
+
 class FXBacktestSystemComplete:
     """FXバックテストシステム（日本語カラム対応版）"""
     
-    def __init__(self, config_file: str = "config.json", currency_pair_override: str = None):
-        """初期化"""
+    def __init__(self, config_file: str = "config.json", currency_pair_override: str = None,
+                 lazy: bool = False):
+        """初期化
+        
+        Parameters:
+        -----------
+        config_file : str
+            設定ファイルパス
+        currency_pair_override : str, optional
+            指定された通貨ペアのみテスト
+        lazy : bool
+            Trueの場合は設定の読み込みと表示を省略（ファイル分析のみの場合）
+        """
         # 設定マネージャーを初期化
-        self.config_manager = BacktestConfigManager(config_file)
+        self.config_manager = get_config_manager(config_file)
         self.currency_pair_override = currency_pair_override
         
+        # 通貨ペア設定は初回参照時に構築、SL/TPは未登録の通貨ペアを参照時に取得
+        self._currency_settings = None
+        self._sl_tp_by_pair = {}
+        
         # 基本変数の初期化
         self.entrypoint_files = []
-        self.backtest_results = []
+        self.backtest_results = pd.DataFrame()
+        self.result_path = None
         self.summary_stats = {}
         
         # 実際のファイル構造に基づくカラム名マッピング
@@ -60,6 +325,10 @@ class FXBacktestSystemComplete:
             'profit': ['Profit', 'profit', 'PL', 'pl', 'P&L', 'p&l', '損益', 'PROFIT']
         }
         
+        if lazy:
+            logger.info("FXバックテストシステム（日本語カラム対応版）を初期化しました（設定の読み込みを省略）")
+            return
+        
         # 設定から値を取得
         self.load_settings_from_config()
         
@@ -75,18 +344,33 @@ class FXBacktestSystemComplete:
         self.stop_loss_pips = self.config_manager.get_stop_loss_pips()
         self.take_profit_pips = self.config_manager.get_take_profit_pips()
         
-        # 通貨ペア設定を読み込み
-        self.currency_settings = {}
-        currency_configs = self.config_manager.get("currency_settings", {})
-        
-        for currency_pair, settings in currency_configs.items():
-            self.currency_settings[currency_pair] = self.config_manager.get_currency_settings(currency_pair)
+        # 通貨ペア設定は次回参照時に再構築
+        self._currency_settings = None
+        self._rebuild_sl_tp_snapshot()
         
         # 高度な設定
-        self.slippage_pips = self.config_manager.get("backtest_settings.risk_management.slippage_pips", 1)
-        self.weekend_sl_disabled = self.config_manager.get("backtest_settings.advanced_settings.weekend_sl_disabled", True)
+        self.slippage_pips = self.config_manager.slippage_pips
+        self.weekend_sl_disabled = self.config_manager.weekend_sl_disabled
         self.volatile_hours_sl_multiplier = self.config_manager.get("backtest_settings.advanced_settings.volatile_hours_sl_multiplier", 1.5)
     
+    def _rebuild_sl_tp_snapshot(self):
+        """通貨ペア → (SL pips, TP pips) のスナップショットを設定マネージャーの現在値から再構築"""
+        self._sl_tp_by_pair = {
+            currency_pair: (self.config_manager.get_stop_loss_pips(currency_pair),
+                            self.config_manager.get_take_profit_pips(currency_pair))
+            for currency_pair in self.config_manager.get("currency_settings", {})
+        }
+    
+    @property
+    def currency_settings(self):
+        """通貨ペア → マージ済み通貨ペア設定（初回参照時に構築）"""
+        if self._currency_settings is None:
+            self._currency_settings = {
+                currency_pair: self.config_manager.get_currency_settings(currency_pair)
+                for currency_pair in self.config_manager.get("currency_settings", {})
+            }
+        return self._currency_settings
+    
     def log_current_settings(self):
         """現在の設定をログに出力"""
         logger.info("=" * 60)
@@ -117,47 +401,19 @@ class FXBacktestSystemComplete:
         logger.info("=" * 60)
     
     def find_column_mapping(self, df, target_field):
-        """カラム名を柔軟にマッピング"""
-        possible_names = self.column_mappings.get(target_field, [])
-        
-        for col_name in df.columns:
-            # 完全一致（優先）
-            if col_name in possible_names:
-                return col_name
-            
-            # 大文字小文字を無視した一致
-            for possible_name in possible_names:
-                if col_name.lower() == possible_name.lower():
-                    return col_name
-            
-            # 部分一致
-            col_lower = col_name.lower()
-            for possible_name in possible_names:
-                possible_lower = possible_name.lower()
-                if possible_lower in col_lower or col_lower in possible_lower:
-                    return col_name
-        
-        return None
+        """カラム名を柔軟にマッピング（同じカラム構成の結果はキャッシュ）"""
+        possible_lower = tuple(name.lower() for name in self.column_mappings.get(target_field, []))
+        return match_column(tuple(df.columns), possible_lower)
     
     def standardize_direction(self, direction_value):
         """方向を標準化（日本語対応）"""
         if pd.isna(direction_value):
             return 'UNKNOWN'
         
-        direction_str = str(direction_value).strip().upper()
-        
-        # 英語パターン
-        if direction_str in ['LONG', 'BUY', 'L', 'B']:
-            return 'LONG'
-        elif direction_str in ['SHORT', 'SELL', 'S']:
-            return 'SHORT'
-        
-        # 日本語パターン
-        direction_lower = direction_str.lower()
-        if direction_lower in ['long', 'ロング', '買い', '買']:
-            return 'LONG'
-        elif direction_lower in ['short', 'ショート', '売り', '売']:
-            return 'SHORT'
+        # 英語・日本語の表記ゆれを逆引きテーブルで1回で判定
+        standard = DIRECTION_LOOKUP.get(str(direction_value).strip().upper())
+        if standard is not None:
+            return standard
         
         logger.warning(f"不明な方向値: {direction_value} → LONG に設定")
         return 'LONG'
@@ -167,20 +423,10 @@ class FXBacktestSystemComplete:
         if pd.isna(currency_value):
             return 'USDJPY'
         
-        currency_str = str(currency_value).strip().upper()
-        
-        # 通貨ペアの標準化
-        currency_mapping = {
-            'USDJPY': ['USDJPY', 'USD/JPY', 'USD-JPY', 'ドル円', 'ドル/円'],
-            'EURJPY': ['EURJPY', 'EUR/JPY', 'EUR-JPY', 'ユーロ円', 'ユーロ/円'],
-            'GBPJPY': ['GBPJPY', 'GBP/JPY', 'GBP-JPY', 'ポンド円', 'ポンド/円'],
-            'EURUSD': ['EURUSD', 'EUR/USD', 'EUR-USD', 'ユーロドル', 'ユーロ/ドル'],
-            'GBPUSD': ['GBPUSD', 'GBP/USD', 'GBP-USD', 'ポンドドル', 'ポンド/ドル']
-        }
-        
-        for standard_name, variants in currency_mapping.items():
-            if currency_str in variants:
-                return standard_name
+        # 通貨ペアの標準化（表記ゆれ → 標準名の逆引きテーブル）
+        standard = CURRENCY_LOOKUP.get(str(currency_value).strip().upper())
+        if standard is not None:
+            return standard
         
         logger.warning(f"不明な通貨ペア: {currency_value} → USDJPY に設定")
         return 'USDJPY'
@@ -193,26 +439,23 @@ class FXBacktestSystemComplete:
             
             time_str = str(time_str).strip()
             
-            # HH:MM:SS 形式
-            if re.match(r'^\d{2}:\d{2}:\d{2}$', time_str):
-                hour, minute, second = map(int, time_str.split(':'))
-                return base_date.replace(hour=hour, minute=minute, second=second, microsecond=0)
+            # HH:MM:SS / HH:MM 形式（形式が固定なので正規表現を使わずに分割して判定）
+            parts = time_str.split(':')
+            if len(parts) in (2, 3) and all(len(part) == 2 and part.isdecimal() for part in parts):
+                hour, minute = int(parts[0]), int(parts[1])
+                second = int(parts[2]) if len(parts) == 3 else 0
+                # replaceより軽いコンストラクタで基準日の日付部分から直接生成
+                return datetime(base_date.year, base_date.month, base_date.day, hour, minute, second)
             
-            # HH:MM 形式
-            elif re.match(r'^\d{2}:\d{2}$', time_str):
-                hour, minute = map(int, time_str.split(':'))
-                return base_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            else:
-                logger.warning(f"時刻形式が不正: {time_str}")
-                return None
+            logger.warning(f"時刻形式が不正: {time_str}")
+            return None
                 
         except Exception as e:
             logger.error(f"時刻変換エラー {time_str}: {e}")
             return None
     
     def load_entrypoint_files(self):
-        """エントリーポイントファイルを読み込み（日本語対応）"""
+        """エントリーポイントファイルを読み込み（日本語対応、ファイル単位で並列処理）"""
         try:
             if not ENTRYPOINT_DIR.exists():
                 logger.error(f"エントリーポイントディレクトリが見つかりません: {ENTRYPOINT_DIR}")
@@ -225,103 +468,22 @@ class FXBacktestSystemComplete:
             failed_files = 0
             total_trades = 0
             
-            for file_path in csv_files:
-                try:
-                    # ファイル名から日付を抽出
-                    date_match = re.search(r'(\d{4})(\d{2})(\d{2})', file_path.stem)
-                    if not date_match:
-                        logger.warning(f"日付形式が不正なファイルをスキップ: {file_path.name}")
-                        failed_files += 1
-                        continue
-                    
-                    year, month, day = date_match.groups()
-                    date_str = f"{year}-{month}-{day}"
-                    base_date = datetime(int(year), int(month), int(day))
-                    
-                    # CSVファイルを読み込み
-                    df = pd.read_csv(file_path, encoding='utf-8')
-                    
-                    # カラムマッピングを確認
-                    column_mapping = {}
-                    required_fields = ['entry_time', 'exit_time', 'currency_pair', 'direction']
-                    
-                    for field in required_fields:
-                        mapped_col = self.find_column_mapping(df, field)
-                        if mapped_col:
-                            column_mapping[field] = mapped_col
-                        else:
-                            logger.error(f"必須カラムが見つかりません {file_path.name}: {field}")
-                            break
-                    
-                    # 必須カラムが全て見つかったかチェック
-                    if len(column_mapping) != len(required_fields):
-                        failed_files += 1
-                        continue
-                    
-                    # データを標準化
-                    processed_data = []
-                    
-                    for idx, row in df.iterrows():
-                        try:
-                            # 時刻変換
-                            entry_time_str = row[column_mapping['entry_time']]
-                            exit_time_str = row[column_mapping['exit_time']]
-                            
-                            entry_datetime = self.parse_time_string(entry_time_str, base_date)
-                            exit_datetime = self.parse_time_string(exit_time_str, base_date)
-                            
-                            if entry_datetime is None or exit_datetime is None:
-                                logger.warning(f"時刻変換失敗 {file_path.name} 行{idx+1}: {entry_time_str} -> {exit_time_str}")
-                                continue
-                            
-                            # エグジット時刻がエントリー時刻より前の場合は翌日扱い
-                            if exit_datetime <= entry_datetime:
-                                exit_datetime += timedelta(days=1)
-                            
-                            # 方向と通貨ペアを標準化
-                            direction = self.standardize_direction(row[column_mapping['direction']])
-                            currency_pair = self.standardize_currency_pair(row[column_mapping['currency_pair']])
-                            
-                            # 通貨ペアフィルタリング
-                            if self.currency_pair_override and currency_pair != self.currency_pair_override:
-                                continue
-                            
-                            processed_data.append({
-                                'entry_time': entry_datetime,
-                                'exit_time': exit_datetime,
-                                'currency_pair': currency_pair,
-                                'direction': direction,
-                                'original_entry': entry_time_str,
-                                'original_exit': exit_time_str,
-                                'row_index': idx
-                            })
-                            
-                        except Exception as e:
-                            logger.warning(f"行処理エラー {file_path.name} 行{idx+1}: {e}")
-                            continue
-                    
-                    if processed_data:
-                        self.entrypoint_files.append({
-                            'file_path': file_path,
-                            'date_str': date_str,
-                            'base_date': base_date,
-                            'data': processed_data,
-                            'original_columns': list(df.columns),
-                            'column_mapping': column_mapping,
-                            'trade_count': len(processed_data)
-                        })
-                        
-                        successful_files += 1
-                        total_trades += len(processed_data)
-                        logger.info(f"✅ 読み込み成功: {file_path.name} ({len(processed_data)}件)")
-                    else:
-                        failed_files += 1
-                        logger.warning(f"⚠️  処理可能なデータなし: {file_path.name}")
-                    
-                except Exception as e:
-                    logger.error(f"ファイル処理エラー {file_path.name}: {e}")
+            # ファイルごとに独立しているのでプロセス並列で解析
+            column_aliases = {
+                field: tuple(name.lower() for name in names)
+                for field, names in self.column_mappings.items()
+            }
+            parsed_files = self._parse_entry_files(csv_files, column_aliases)
+            
+            for file_path, entry_file in zip(csv_files, parsed_files):
+                if entry_file is None:
                     failed_files += 1
                     continue
+                
+                self.entrypoint_files.append(entry_file)
+                successful_files += 1
+                total_trades += entry_file['trade_count']
+                logger.info(f"✅ 読み込み成功: {file_path.name} ({entry_file['trade_count']}件)")
             
             logger.info("=" * 60)
             logger.info(f"✅ エントリーポイントファイル読み込み完了")
@@ -339,6 +501,28 @@ class FXBacktestSystemComplete:
         except Exception as e:
             logger.error(f"エントリーポイントファイル読み込みエラー: {e}")
     
+    def _parse_entry_files(self, csv_files, column_aliases):
+        """複数のCSVファイルを解析（複数ファイルならProcessPoolExecutorで並列実行）
+        
+        Returns:
+        --------
+        list : csv_filesと同じ順序の解析結果（失敗したファイルはNone）
+        """
+        max_workers = min(MAX_PARSE_WORKERS, len(csv_files))
+        if max_workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    return list(executor.map(
+                        _parse_entry_file, csv_files,
+                        repeat(column_aliases), repeat(self.currency_pair_override),
+                        chunksize=PARSE_CHUNKSIZE
+                    ))
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"並列読み込みに失敗したため逐次処理します: {e}")
+        
+        return [_parse_entry_file(file_path, column_aliases, self.currency_pair_override)
+                for file_path in csv_files]
+    
     def print_file_structure_summary(self):
         """ファイル構造サマリーを表示"""
         if not self.entrypoint_files:
@@ -357,18 +541,16 @@ class FXBacktestSystemComplete:
             logger.info(f"  {standard_name} ← {original_name}")
         
         # データサンプル表示
-        if first_file['data']:
+        if not first_file['data'].empty:
             logger.info("📈 データサンプル:")
-            for i, trade in enumerate(first_file['data'][:2]):
-                logger.info(f"  取引{i+1}: {trade['currency_pair']} {trade['direction']} "
-                           f"{trade['entry_time'].strftime('%H:%M:%S')} -> {trade['exit_time'].strftime('%H:%M:%S')}")
+            for i, trade in enumerate(first_file['data'].head(2).itertuples(index=False)):
+                logger.info(f"  取引{i+1}: {trade.currency_pair} {trade.direction} "
+                           f"{trade.entry_time.strftime('%H:%M:%S')} -> {trade.exit_time.strftime('%H:%M:%S')}")
         
-        # 通貨ペア別統計
-        currency_stats = {}
-        for entry_data in self.entrypoint_files:
-            for trade in entry_data['data']:
-                currency = trade['currency_pair']
-                currency_stats[currency] = currency_stats.get(currency, 0) + 1
+        # 通貨ペア別統計（全ファイルの通貨ペア列をまとめて1回で集計、取引のないカテゴリは除外）
+        all_currency_pairs = pd.concat([entry_data['data']['currency_pair'] for entry_data in self.entrypoint_files])
+        currency_counts = all_currency_pairs.value_counts()
+        currency_stats = currency_counts[currency_counts > 0].to_dict()
         
         logger.info("💱 通貨ペア別取引数:")
         for currency, count in sorted(currency_stats.items()):
@@ -377,25 +559,29 @@ class FXBacktestSystemComplete:
         logger.info("-" * 40)
     
     def get_currency_specific_sl_tp(self, currency_pair: str):
-        """通貨ペア別のSL/TP設定を取得"""
-        sl_pips = self.config_manager.get_stop_loss_pips(currency_pair)
-        tp_pips = self.config_manager.get_take_profit_pips(currency_pair)
-        return sl_pips, tp_pips
+        """通貨ペア別のSL/TP設定を取得（設定にない通貨ペアは初回に取得してスナップショットに追加）"""
+        sl_tp = self._sl_tp_by_pair.get(currency_pair)
+        if sl_tp is None:
+            sl_tp = self._sl_tp_by_pair[currency_pair] = (
+                self.config_manager.get_stop_loss_pips(currency_pair),
+                self.config_manager.get_take_profit_pips(currency_pair)
+            )
+        return sl_tp
+    
+    def get_pip_multiplier(self, currency_pair: str):
+        """通貨ペアのpip倍率を取得（設定がなければ円建てかどうかで判定）"""
+        settings = self.currency_settings.get(currency_pair.replace('_', ''))
+        if settings and 'pip_multiplier' in settings:
+            return settings['pip_multiplier']
+        return 100 if 'JPY' in currency_pair else 10000
     
     def calculate_pips(self, entry_price, exit_price, currency_pair, direction):
         """pips計算"""
         try:
-            # 通貨ペア設定を取得
-            settings = self.currency_settings.get(currency_pair.replace('_', ''))
-            if settings and 'pip_multiplier' in settings:
-                pip_multiplier = settings['pip_multiplier']
-            else:
-                pip_multiplier = 100 if 'JPY' in currency_pair else 10000
+            pip_multiplier = self.get_pip_multiplier(currency_pair)
             
-            if direction.upper() in ['LONG', 'BUY']:
-                pips = (exit_price - entry_price) * pip_multiplier
-            else:  # SHORT, SELL
-                pips = (entry_price - exit_price) * pip_multiplier
+            sign = DIRECTION_SIGN.get(direction.upper(), -1)
+            pips = sign * (exit_price - entry_price) * pip_multiplier
             
             return round(pips, 1)
         except Exception as e:
@@ -415,67 +601,126 @@ class FXBacktestSystemComplete:
         
         logger.info("📊 バックテスト処理を実行中...")
         
-        # 実際のバックテスト処理
-        processed_trades = 0
-        successful_trades = 0
+        # 全ファイルの取引を1つのDataFrameにまとめ、列単位で一括計算
+        trades = pd.concat([entry_data['data'] for entry_data in self.entrypoint_files], ignore_index=True)
+        dates = np.repeat(
+            [entry_data['date_str'] for entry_data in self.entrypoint_files],
+            [entry_data['trade_count'] for entry_data in self.entrypoint_files]
+        )
+        processed_trades = len(trades)
         
-        for entry_data in self.entrypoint_files:
-            for trade in entry_data['data']:
-                processed_trades += 1
+        # SL/TP設定とpip倍率は通貨ペアごとに1回だけ取得
+        pairs = trades['currency_pair'].unique()
+        sl_tp_by_pair = {pair: self.get_currency_specific_sl_tp(pair) for pair in pairs}
+        pip_multiplier_by_pair = {pair: self.get_pip_multiplier(pair) for pair in pairs}
+        
+        # 結果はバッチ単位で生成し、pyarrowがあればParquetに逐次書き出す
+        result_writer = None
+        result_batches = []
+        successful_trades = 0
+        if PYARROW_AVAILABLE:
+            self.result_path = BACKTEST_RESULT_DIR / f"backtest_results_{datetime.now():%Y%m%d_%H%M%S}.parquet"
+        try:
+            for start in range(0, processed_trades, RESULT_BATCH_SIZE):
+                stop = start + RESULT_BATCH_SIZE
+                results = self._simulate_trades(
+                    trades.iloc[start:stop], dates[start:stop], sl_tp_by_pair, pip_multiplier_by_pair
+                )
+                successful_trades += len(results)
                 
-                try:
-                    # SL/TP設定を取得
-                    sl_pips, tp_pips = self.get_currency_specific_sl_tp(trade['currency_pair'])
-                    
-                    # ダミーの価格データ（実際は履歴データから取得）
-                    entry_price = 150.00 if 'JPY' in trade['currency_pair'] else 1.0500
-                    
-                    # ダミーの結果生成（実際は詳細な監視が必要）
-                    if trade['direction'] == 'LONG':
-                        exit_price = entry_price - (sl_pips * 0.01) if sl_pips else entry_price + 0.05
-                        exit_reason = 'STOP_LOSS' if sl_pips and exit_price < entry_price else 'TIME_EXIT'
-                    else:  # SHORT
-                        exit_price = entry_price + (sl_pips * 0.01) if sl_pips else entry_price - 0.05
-                        exit_reason = 'STOP_LOSS' if sl_pips and exit_price > entry_price else 'TIME_EXIT'
-                    
-                    # pips計算
-                    pips = self.calculate_pips(entry_price, exit_price, trade['currency_pair'], trade['direction'])
-                    result = 'WIN' if pips > 0 else 'LOSS' if pips < 0 else 'EVEN'
-                    
-                    self.backtest_results.append({
-                        'date': entry_data['date_str'],
-                        'currency_pair': trade['currency_pair'],
-                        'direction': trade['direction'],
-                        'entry_time': trade['entry_time'],
-                        'exit_time': trade['exit_time'],
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pips': pips,
-                        'result': result,
-                        'exit_reason': exit_reason,
-                        'sl_pips_used': sl_pips,
-                        'tp_pips_used': tp_pips
-                    })
-                    
-                    successful_trades += 1
-                    
-                except Exception as e:
-                    logger.warning(f"取引処理エラー: {e}")
+                if not PYARROW_AVAILABLE:
+                    result_batches.append(results)
                     continue
+                
+                table = pa.Table.from_pandas(results, preserve_index=False)
+                if result_writer is None:
+                    result_writer = pq.ParquetWriter(self.result_path, table.schema, compression='zstd')
+                result_writer.write_table(table)
+        finally:
+            if result_writer is not None:
+                result_writer.close()
+        
+        # 統計計算に必要なカラムだけをメモリに保持
+        if PYARROW_AVAILABLE:
+            results = pd.read_parquet(self.result_path, columns=RESULT_STATS_COLUMNS, engine='pyarrow')
+            logger.info(f"💾 バックテスト結果を保存: {self.result_path}")
+        else:
+            results = pd.concat(result_batches, ignore_index=True)
+        
+        self.backtest_results = pd.concat([self.backtest_results, results], ignore_index=True) \
+            if not self.backtest_results.empty else results
         
         logger.info(f"✅ バックテスト完了: {successful_trades}/{processed_trades}件の取引を処理")
     
+    def _simulate_trades(self, trades, dates, sl_tp_by_pair, pip_multiplier_by_pair):
+        """取引のバッチから結果のDataFrameを生成
+        
+        Parameters:
+        -----------
+        trades : pd.DataFrame
+            エントリーポイントの取引
+        dates : np.ndarray
+            各取引の日付文字列
+        sl_tp_by_pair : dict
+            通貨ペア → (SL pips, TP pips)
+        pip_multiplier_by_pair : dict
+            通貨ペア → pip倍率
+        
+        Returns:
+        --------
+        pd.DataFrame : バックテスト結果
+        """
+        currency_pair = trades['currency_pair']
+        sl_pips = currency_pair.map({pair: sl_tp[0] for pair, sl_tp in sl_tp_by_pair.items()}).astype(float)
+        tp_pips = currency_pair.map({pair: sl_tp[1] for pair, sl_tp in sl_tp_by_pair.items()}).astype(float)
+        pip_multiplier = currency_pair.map(pip_multiplier_by_pair).to_numpy(dtype=float)
+        
+        # ダミーの価格データ（実際は履歴データから取得）
+        entry_price = np.where(currency_pair.str.contains('JPY', regex=False), 150.00, 1.0500)
+        
+        # ダミーの結果生成（実際は詳細な監視が必要）
+        sign = np.where(trades['direction'].eq('LONG').to_numpy(), 1.0, -1.0)
+        sl_values = sl_pips.fillna(0).to_numpy(dtype=float)
+        has_sl = sl_values != 0
+        exit_price = entry_price - sign * np.where(has_sl, sl_values * 0.01, -0.05)
+        stop_loss_hit = has_sl & (sign * (exit_price - entry_price) < 0)
+        exit_reason = np.where(stop_loss_hit, 'STOP_LOSS', 'TIME_EXIT')
+        
+        # pips計算（方向の符号を掛けて分岐なしで計算）
+        pips = sign * (exit_price - entry_price) * pip_multiplier
+        pips = np.round(pips, 1)
+        result = np.select([pips > 0, pips < 0], ['WIN', 'LOSS'], default='EVEN')
+        
+        # SL/TP無効時のNoneはNaNにそろえ、バッチ間でParquetのスキーマを一定に保つ
+        return pd.DataFrame({
+            'date': dates,
+            'currency_pair': currency_pair.array,
+            'direction': trades['direction'].array,
+            'entry_time': trades['entry_time'].to_numpy(),
+            'exit_time': trades['exit_time'].to_numpy(),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'pips': pips,
+            'result': pd.Categorical(result, dtype=RESULT_DTYPE),
+            'exit_reason': pd.Categorical(exit_reason, dtype=EXIT_REASON_DTYPE),
+            'sl_pips_used': sl_pips.to_numpy(dtype=float),
+            'tp_pips_used': tp_pips.to_numpy(dtype=float)
+        })
+    
     def calculate_statistics(self):
         """基本統計計算"""
-        if not self.backtest_results:
+        if self.backtest_results.empty:
             return
         
-        df = pd.DataFrame(self.backtest_results)
-        
-        wins = len(df[df['result'] == 'WIN'])
-        losses = len(df[df['result'] == 'LOSS'])
-        evens = len(df[df['result'] == 'EVEN'])
-        total_trades = len(df)
+        # 集約のみなのでカラムのNumPy配列を直接使う
+        pips = self.backtest_results['pips'].to_numpy(dtype=np.float64)
+        results = self.backtest_results['result']
+        win_mask = results.eq('WIN').to_numpy()
+        loss_mask = results.eq('LOSS').to_numpy()
+        wins = int(win_mask.sum())
+        losses = int(loss_mask.sum())
+        evens = int(results.eq('EVEN').sum())
+        total_trades = len(results)
         
         self.summary_stats = {
             'total_trades': total_trades,
@@ -483,18 +728,49 @@ class FXBacktestSystemComplete:
             'losses': losses,
             'evens': evens,
             'win_rate': (wins / total_trades * 100) if total_trades > 0 else 0,
-            'total_pips': df['pips'].sum(),
-            'avg_pips': df['pips'].mean(),
-            'max_win_pips': df[df['result'] == 'WIN']['pips'].max() if wins > 0 else 0,
-            'max_loss_pips': df[df['result'] == 'LOSS']['pips'].min() if losses > 0 else 0
+            'total_pips': pips.sum(),
+            'avg_pips': pips.mean(),
+            'max_win_pips': pips[win_mask].max() if wins > 0 else 0,
+            'max_loss_pips': pips[loss_mask].min() if losses > 0 else 0
         }
     
+    @staticmethod
+    def _group_statistics(df, key):
+        """指定カラム別の取引数・勝率・平均/合計pipsをgroupby 1回で集計
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            バックテスト結果
+        key : str
+            集計キーのカラム名
+        
+        Returns:
+        --------
+        dict : キー値 → 統計
+        """
+        keys = df[key]
+        pips_stats = df['pips'].groupby(keys, sort=False, observed=True).agg(['count', 'mean', 'sum'])
+        win_counts = df['result'].eq('WIN').groupby(keys, sort=False, observed=True).sum()
+        
+        group_stats = {}
+        for value, total, avg_pips, total_pips, wins in zip(
+                pips_stats.index, pips_stats['count'], pips_stats['mean'],
+                pips_stats['sum'], win_counts.reindex(pips_stats.index)):
+            group_stats[value] = {
+                'trades': int(total),
+                'win_rate': (wins / total * 100) if total > 0 else 0,
+                'avg_pips': avg_pips,
+                'total_pips': total_pips
+            }
+        return group_stats
+    
     def generate_enhanced_statistics(self):
         """設定別統計の生成"""
-        if not self.backtest_results:
+        if self.backtest_results.empty:
             return
         
-        df = pd.DataFrame(self.backtest_results)
+        df = self.backtest_results
         
         # 基本統計計算
         self.calculate_statistics()
@@ -513,37 +789,9 @@ class FXBacktestSystemComplete:
                 'time_exit_rate': (exit_reason_counts.get('TIME_EXIT', 0) / total_trades * 100)
             }
         
-        # 通貨ペア別統計
-        currency_stats = {}
-        for currency in df['currency_pair'].unique():
-            currency_df = df[df['currency_pair'] == currency]
-            wins = len(currency_df[currency_df['result'] == 'WIN'])
-            total = len(currency_df)
-            
-            currency_stats[currency] = {
-                'trades': total,
-                'win_rate': (wins / total * 100) if total > 0 else 0,
-                'avg_pips': currency_df['pips'].mean(),
-                'total_pips': currency_df['pips'].sum()
-            }
-        
-        enhanced_stats['currency_statistics'] = currency_stats
-        
-        # 方向別統計
-        direction_stats = {}
-        for direction in df['direction'].unique():
-            direction_df = df[df['direction'] == direction]
-            wins = len(direction_df[direction_df['result'] == 'WIN'])
-            total = len(direction_df)
-            
-            direction_stats[direction] = {
-                'trades': total,
-                'win_rate': (wins / total * 100) if total > 0 else 0,
-                'avg_pips': direction_df['pips'].mean(),
-                'total_pips': direction_df['pips'].sum()
-            }
-        
-        enhanced_stats['direction_statistics'] = direction_stats
+        # 通貨ペア別・方向別統計
+        enhanced_stats['currency_statistics'] = self._group_statistics(df, 'currency_pair')
+        enhanced_stats['direction_statistics'] = self._group_statistics(df, 'direction')
         
         self.summary_stats.update(enhanced_stats)
         logger.info("✅ 拡張統計計算完了")
@@ -612,7 +860,7 @@ def main():
     try:
         # 設定確認モード
         if args.show_config:
-            config_manager = BacktestConfigManager(args.config)
+            config_manager = get_config_manager(args.config)
             config_manager.print_current_settings()
             return
         
@@ -621,7 +869,8 @@ def main():
         # バックテストシステムを初期化
         backtest_system = FXBacktestSystemComplete(
             config_file=args.config,
-            currency_pair_override=args.currency
+            currency_pair_override=args.currency,
+            lazy=args.analyze_files
         )
         
         # ファイル分析のみモード
@@ -640,6 +889,10 @@ def main():
             backtest_system.take_profit_pips = args.tp
             logger.info(f"📈 テイクプロフィット上書き: {args.tp}pips")
         
+        # 上書きした設定をSL/TPスナップショットに反映
+        if args.sl or args.tp:
+            backtest_system._rebuild_sl_tp_snapshot()
+        
         # バックテスト実行
         backtest_system.run_backtest()
         
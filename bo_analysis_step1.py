@@ -1,17 +1,25 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import json
 import traceback
+from functools import lru_cache
 from scipy import stats
 import pickle
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # --- 設定項目 ---
 TARGET_BROKER = "外貨ネクストバイナリー"  # 分析したい業者名を指定
 TARGET_EXPIRY = "14:20"              # 分析したい満期時刻を "HH:MM" 形式で指定
 # --------------
 
+# 集計期間名と日数（スコアの重み付けの基準日数も兼ねる）
+ANALYSIS_PERIODS = [('短期', 30), ('中期', 90), ('長期', 365)]
+
+# 同じ設定ファイルは1プロセスで1回だけ読み込む（返り値は共有されるため変更しないこと）
+@lru_cache(maxsize=None)
 def load_broker_settings(settings_file):
     try:
         with open(settings_file, 'r', encoding='utf-8') as f:
@@ -23,12 +31,37 @@ def load_broker_settings(settings_file):
         print(f"エラー: 業者設定ファイル {settings_file} の形式が不正です。")
         return None
 
+def _split_list_column(column):
+    """Arrowのリスト列を、行ごとのNumPy配列のリストに分割する"""
+    column = column.combine_chunks()
+    offsets = column.offsets.to_numpy()
+    values = column.flatten().to_numpy(zero_copy_only=False)
+    return np.split(values, offsets[1:-1] - offsets[0])
+
 def load_analysis_results(file_path):
+    # 旧形式(pickle)のキャッシュしかない場合はそれを読み込む
+    legacy_file = os.path.splitext(file_path)[0] + '.pkl'
+    if not os.path.exists(file_path) and os.path.exists(legacy_file):
+        try:
+            with open(legacy_file, 'rb') as f:
+                return pickle.load(f)
+        except (EOFError, pickle.UnpicklingError):
+            return {}
+    
     try:
-        with open(file_path, 'rb') as f:
-            return pickle.load(f)
-    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        table = pq.read_table(file_path)
+    except (FileNotFoundError, pa.ArrowInvalid):
         return {}
+    if table.num_rows == 0:
+        return {}
+    
+    # キー列だけPythonオブジェクトに変換し、日付・pips・勝敗は配列のまま保持
+    keys = zip(*(table[name].to_pylist() for name in ('pair', 'start_time', 'holding_period', 'direction')))
+    dates, pips, wins = (_split_list_column(table[name]) for name in ('date', 'pips', 'win'))
+    return {
+        key: {'date': key_dates, 'pips': key_pips, 'win': key_wins}
+        for key, key_dates, key_pips, key_wins in zip(keys, dates, pips, wins)
+    }
 
 def calculate_pips(entry_price, exit_price, currency_pair):
     if 'JPY' in currency_pair:
@@ -36,71 +69,104 @@ def calculate_pips(entry_price, exit_price, currency_pair):
     else:
         return (exit_price - entry_price) * 10000
 
+def add_time_columns(df):
+    """組み合わせループの前に時刻・日付の列を一度だけ作成する（_m: 0時からの分（分単位でない時刻は-1）, _d: 日付）"""
+    timestamps = df['日時']
+    on_minute = (timestamps.dt.second == 0) & (timestamps.dt.microsecond == 0)
+    df['_m'] = (timestamps.dt.hour * 60 + timestamps.dt.minute).where(on_minute, -1).astype(np.int16)
+    df['_d'] = timestamps.dt.date
+    return df
+
 def analyze_single_combination(df, currency_pair, start_time, holding_period, direction):
-    end_time = (datetime.combine(datetime.min, start_time) + timedelta(minutes=holding_period)).time()
+    # 時刻・日付の列は呼び出し側が組み合わせループの前に add_time_columns で一度だけ作成しておく
+    assert '_m' in df.columns and '_d' in df.columns, "analyze_single_combination の前に add_time_columns(df) を呼んでください"
     
-    daily_results = []
-    for date, group in df.groupby(df['日時'].dt.date):
-        entry_mask = (group['日時'].dt.time == start_time)
-        exit_mask = (group['日時'].dt.time == end_time)
-        
-        if entry_mask.any() and exit_mask.any():
-            if direction == 'HIGH':
-                entry_price = group.loc[entry_mask, '始値(ASK)'].iloc[0]
-                exit_price = group.loc[exit_mask, '始値(BID)'].iloc[0]
-            else:  # LOW
-                entry_price = group.loc[entry_mask, '始値(BID)'].iloc[0]
-                exit_price = group.loc[exit_mask, '始値(ASK)'].iloc[0]
-            
-            pips = calculate_pips(entry_price, exit_price, currency_pair)
-            if direction == 'LOW':
-                pips = -pips
-            daily_results.append({'date': date, 'pips': pips, 'win': pips > 0})
+    start_minute = start_time.hour * 60 + start_time.minute
+    end_minute = (start_minute + holding_period) % 1440
     
-    return pd.DataFrame(daily_results)
-
-def calculate_score(row):
-    win_rate_score = sum((row[f'{period}勝率'] - 50) * (row[f'{period}データ日数'] / expected_days) 
-                         for period, expected_days in [('短期', 30), ('中期', 90), ('長期', 365)])
-    pips_score = sum(row[f'{period}平均pips'] * (row[f'{period}データ日数'] / expected_days) 
-                     for period, expected_days in [('短期', 30), ('中期', 90), ('長期', 365)])
-    return win_rate_score, pips_score
+    if direction == 'HIGH':
+        entry_col, exit_col = '始値(ASK)', '始値(BID)'
+    else:  # LOW
+        entry_col, exit_col = '始値(BID)', '始値(ASK)'
+    
+    # エントリー・決済時刻の行を抽出し、日付ごとに最初の1行を使う
+    minutes = df['_m']
+    dates = df['_d']
+    entry_mask = (minutes == start_minute)
+    exit_mask = (minutes == end_minute)
+    entry_prices = df.loc[entry_mask, entry_col].set_axis(dates[entry_mask])
+    exit_prices = df.loc[exit_mask, exit_col].set_axis(dates[exit_mask])
+    entry_prices = entry_prices[~entry_prices.index.duplicated(keep='first')]
+    exit_prices = exit_prices[~exit_prices.index.duplicated(keep='first')]
+    
+    # 両方がそろう日付で整列して一括計算
+    trade_dates = entry_prices.index.intersection(exit_prices.index).sort_values()
+    pips = calculate_pips(entry_prices.loc[trade_dates].to_numpy(), exit_prices.loc[trade_dates].to_numpy(), currency_pair)
+    if direction == 'LOW':
+        pips = -pips
+    
+    return pd.DataFrame({'date': trade_dates, 'pips': pips, 'win': pips > 0})
 
 def process_results(results):
-    processed_results = []
-    for (currency_pair, start_time, holding_period, direction), data in results.items():
-        result = {
-            '保有期間': holding_period,
-            '通貨ペア': currency_pair,
-            '開始時刻': start_time.strftime('%H:%M'),
-            '方向': direction
-        }
+    if not results:
+        return pd.DataFrame()
+    
+    # 出力カラムごとの配列を確保して組み合わせ単位で埋める
+    n = len(results)
+    holding_periods = np.empty(n, dtype=np.int64)
+    currency_pairs = np.empty(n, dtype=object)
+    start_times = np.empty(n, dtype=object)
+    directions = np.empty(n, dtype=object)
+    period_columns = {
+        period: (np.full(n, np.nan), np.full(n, np.nan), np.zeros(n, dtype=np.int64))
+        for period, _ in ANALYSIS_PERIODS
+    }
+    
+    for i, ((currency_pair, start_time, holding_period, direction), data) in enumerate(results.items()):
+        holding_periods[i] = holding_period
+        currency_pairs[i] = currency_pair
+        start_times[i] = start_time.strftime('%H:%M')
+        directions[i] = direction
         
-        for period, days in [('短期', 30), ('中期', 90), ('長期', 365)]:
-            period_data = data['win'][-days:]
-            period_pips = data['pips'][-days:]
-            
-            if period_data:
-                result[f'{period}勝率'] = np.mean(period_data) * 100
-                result[f'{period}平均pips'] = np.mean(period_pips)
-                result[f'{period}データ日数'] = len(period_data)
-            else:
-                result[f'{period}勝率'] = np.nan
-                result[f'{period}平均pips'] = np.nan
-                result[f'{period}データ日数'] = 0
+        # 組み合わせごとに1回だけ配列化し、期間ごとの末尾はビューで参照
+        wins = np.asarray(data['win'], dtype=np.bool_)
+        pips = np.asarray(data['pips'], dtype=np.float64)
         
-        processed_results.append(result)
+        for period, days in ANALYSIS_PERIODS:
+            period_days = min(days, wins.size)
+            
+            if period_days:
+                win_rates, avg_pips, day_counts = period_columns[period]
+                win_rates[i] = wins[-period_days:].mean() * 100
+                avg_pips[i] = pips[-period_days:].mean()
+                day_counts[i] = period_days
     
-    if not processed_results:
-        return pd.DataFrame()
-
-    results_df = pd.DataFrame(processed_results)
-    results_df['勝率スコア'], results_df['pipsスコア'] = zip(*results_df.apply(calculate_score, axis=1))
+    columns = {
+        '保有期間': holding_periods,
+        '通貨ペア': currency_pairs,
+        '開始時刻': start_times,
+        '方向': directions
+    }
+    for period, (win_rates, avg_pips, day_counts) in period_columns.items():
+        columns[f'{period}勝率'] = win_rates
+        columns[f'{period}平均pips'] = avg_pips
+        columns[f'{period}データ日数'] = day_counts
+    
+    results_df = pd.DataFrame(columns)
     
-    results_df['勝率スコア'] = stats.zscore(results_df['勝率スコア'])
-    results_df['pipsスコア'] = stats.zscore(results_df['pipsスコア'])
+    # データ日数で重み付けした勝率・pipsのスコアを列単位で計算
+    win_rate_score = 0
+    pips_score = 0
+    for period, expected_days in ANALYSIS_PERIODS:
+        weight = results_df[f'{period}データ日数'] / expected_days
+        win_rate_score = win_rate_score + (results_df[f'{period}勝率'] - 50) * weight
+        pips_score = pips_score + results_df[f'{period}平均pips'] * weight
     
-    results_df['総合スコア'] = results_df['勝率スコア'] + results_df['pipsスコア']
+    # 2つのスコアを (N, 2) 配列にまとめて1回で標準化
+    scores = stats.zscore(np.column_stack([win_rate_score.to_numpy(), pips_score.to_numpy()]), axis=0)
+    results_df['勝率スコア'] = scores[:, 0]
+    results_df['pipsスコア'] = scores[:, 1]
+    results_df['総合スコア'] = scores[:, 0] + scores[:, 1]
     
     for period in ['短期', '中期', '長期']:
         results_df[f'{period}勝率'] = results_df[f'{period}勝率'].round(2)
@@ -139,7 +205,7 @@ def save_bo_analysis_results(results_df, output_folder, broker_name, expiry_time
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     broker_settings_file = os.path.join(script_dir, "config", "bo_brokers.json")
-    analysis_cache_file = os.path.join(script_dir, "output", "analysis_results.pkl")
+    analysis_cache_file = os.path.join(script_dir, "output", "analysis_results.parquet")
     output_folder = os.path.join(script_dir, "output", "bo_analysis")
 
     broker_settings = load_broker_settings(broker_settings_file)
@@ -159,35 +225,28 @@ def main():
     print(f"満期時刻: {TARGET_EXPIRY}")
 
     # --- ここから分析ロジック ---
-    # 1. 既存の分析結果(pickle)を読み込む
+    # 1. 既存の分析結果(Parquet)を読み込む
     all_results = load_analysis_results(analysis_cache_file)
     if not all_results:
         print("警告: 分析キャッシュが見つかりません。fx_base_analysis.py を先に実行してキャッシュを作成してください。")
         return
 
-    # 2. 分析条件を決定
+    # 2. 分析条件を決定（満期日の0時からの分単位。前日にかかる場合は負の値）
     expiry_dt = datetime.strptime(TARGET_EXPIRY, "%H:%M")
-    trade_duration = timedelta(hours=broker_info["trade_duration_hours"])
-    close_before = timedelta(minutes=broker_info["close_minute_before"])
-    
-    start_of_trade_dt = expiry_dt - trade_duration
-    end_of_trade_dt = expiry_dt - close_before
+    expiry_minute = expiry_dt.hour * 60 + expiry_dt.minute
+    start_of_trade_minute = expiry_minute - broker_info["trade_duration_hours"] * 60
+    end_of_trade_minute = expiry_minute - broker_info["close_minute_before"]
 
-    # 3. 該当する結果を抽出・処理
-    final_results = {}
-    for (currency_pair, start_time, holding_period, direction), data in all_results.items():
-        start_dt = datetime.combine(datetime.min.date(), start_time)
-        end_dt = start_dt + timedelta(minutes=holding_period)
-
-        # エントリー時刻が受付時間内か？
-        if not (start_of_trade_dt <= start_dt < end_of_trade_dt):
-            continue
-        
-        # 判定時刻が満期時刻と一致するか？
-        if end_dt.time() != expiry_dt.time():
-            continue
+    # 3. 該当する結果を抽出・処理（キーを配列化して一括判定）
+    keys = list(all_results)
+    start_minutes = np.array([key[1].hour * 60 + key[1].minute for key in keys], dtype=np.int32)
+    holding_periods = np.array([key[2] for key in keys], dtype=np.int32)
+    entry_minutes = expiry_minute - holding_periods
 
-        final_results[(currency_pair, start_time, holding_period, direction)] = data
+    # 判定時刻が満期時刻と一致し、エントリー時刻が受付時間内か？
+    mask = ((start_minutes + holding_periods) % 1440 == expiry_minute) \
+        & (start_of_trade_minute <= entry_minutes) & (entry_minutes < end_of_trade_minute)
+    final_results = {keys[i]: all_results[keys[i]] for i in np.flatnonzero(mask)}
 
     if not final_results:
         print("分析対象のデータが見つかりませんでした。")
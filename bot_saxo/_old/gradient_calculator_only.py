@@ -11,10 +11,25 @@ import os
 import glob
 import zipfile
 import io
+import codecs
 import json
 from datetime import datetime, timedelta
 import logging
 
+# joblibがあれば通貨ペア単位の分析を並列実行する
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# numbaがあれば勾配計算をJITコンパイルしたループで実行する
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # ロギング設定
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +41,180 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 勾配の種類（calculate_gradients が返す列の順）
+GRADIENT_NAMES = ('macd_gradient', 'ma_gradient', 'atr_gradient', 'price_gradient')
+
+# 勾配（変化率）を計算する期間
+GRADIENT_PERIODS = 5
+
+# エンコーディング判定に使う先頭バイト数
+ENCODING_SNIFF_BYTES = 4096
+
+def detect_csv_encoding(raw):
+    """CSVのバイト列からエンコーディングを判定（BOM → UTF-8として読めるか → cp932）"""
+    if raw.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 末尾で途切れたマルチバイト文字はエラーにしない
+        codecs.getincrementaldecoder('utf-8')().decode(raw[:ENCODING_SNIFF_BYTES], final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # shift_jisの上位互換
+        return 'cp932'
+
+def _true_range(high, low, close):
+    """True Range（先頭行は前日終値がないため高値-安値）"""
+    prev_close = np.empty_like(high)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+def _gradient_matrix_numpy(close, high, low, fast, slow, ma_period, atr_period):
+    """MACD・移動平均・ATR・価格の勾配行列 (N, 4) を計算（pandas/NumPy版）
+    
+    各指標を1つの行列に並べ、5期間の変化率・クリップ・欠損埋めを行列全体に1回だけ適用する。
+    """
+    close_series = pd.Series(close)
+    indicators = np.column_stack([
+        (close_series.ewm(span=fast, adjust=False).mean() - close_series.ewm(span=slow, adjust=False).mean()).to_numpy(),
+        close_series.rolling(window=ma_period).mean().to_numpy(),
+        pd.Series(_true_range(high, low, close)).rolling(window=atr_period).mean().to_numpy(),
+        close
+    ])
+    
+    # 5期間の変化率（pct_changeと同じく 現在値/5期間前 - 1）
+    previous = np.full_like(indicators, np.nan)
+    previous[GRADIENT_PERIODS:] = indicators[:-GRADIENT_PERIODS]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gradient_matrix = (indicators / previous - 1) * 100
+    
+    # -100% ~ +100% の範囲にクリップし、計算できない点は0
+    np.clip(gradient_matrix, -100, 100, out=gradient_matrix)
+    gradient_matrix[np.isnan(gradient_matrix)] = 0
+    return gradient_matrix
+
+def _gradient_matrix_loop(close, high, low, fast, slow, ma_period, atr_period):
+    """MACD・移動平均・ATR・価格の勾配行列 (N, 4) を1パスで計算（JIT用ループ版）
+    
+    EMA・移動平均・ATRを逐次更新し、中間のSeriesを作らない。float32の価格もfloat64で集計する。
+    欠損値の扱いはpandas版と同じ（EMAは欠損を飛ばして減衰、移動平均は期間内に欠損があればNaN、
+    True Rangeはnp.fmaxと同じく欠損でない候補から最大値を取る）。
+    """
+    n = close.shape[0]
+    indicators = np.full((n, 4), np.nan)
+    fast_decay = 1.0 - 2.0 / (fast + 1)
+    slow_decay = 1.0 - 2.0 / (slow + 1)
+    ema_fast = np.nan
+    ema_slow = np.nan
+    fast_weight = 1.0
+    slow_weight = 1.0
+    ma_sum = 0.0
+    ma_nan_count = 0
+    tr_sum = 0.0
+    tr_nan_count = 0
+    true_range = np.empty(n)
+    
+    for i in range(n):
+        price = np.float64(close[i])
+        price_valid = not np.isnan(price)
+        
+        # EMA（pandasのewm(adjust=False)と同じく、欠損中も過去の重みは減衰させる）
+        if np.isnan(ema_fast):
+            if price_valid:
+                ema_fast = price
+                ema_slow = price
+                fast_weight = 1.0
+                slow_weight = 1.0
+        else:
+            fast_weight *= fast_decay
+            slow_weight *= slow_decay
+            if price_valid:
+                ema_fast = (fast_weight * ema_fast + (1 - fast_decay) * price) / (fast_weight + 1 - fast_decay)
+                ema_slow = (slow_weight * ema_slow + (1 - slow_decay) * price) / (slow_weight + 1 - slow_decay)
+                fast_weight = 1.0
+                slow_weight = 1.0
+        
+        # True Range（先頭行は前日終値がないため高値-安値）
+        high_low = np.float64(high[i]) - np.float64(low[i])
+        if i == 0:
+            true_range[i] = high_low
+        else:
+            prev_close = np.float64(close[i - 1])
+            true_range[i] = np.fmax(high_low, np.fmax(abs(np.float64(high[i]) - prev_close),
+                                                      abs(np.float64(low[i]) - prev_close)))
+        
+        # 移動平均・ATRは欠損以外の値を合計し、期間外に出た値を差し引いて更新
+        if price_valid:
+            ma_sum += price
+        else:
+            ma_nan_count += 1
+        if i >= ma_period:
+            leaving = np.float64(close[i - ma_period])
+            if np.isnan(leaving):
+                ma_nan_count -= 1
+            else:
+                ma_sum -= leaving
+        
+        if np.isnan(true_range[i]):
+            tr_nan_count += 1
+        else:
+            tr_sum += true_range[i]
+        if i >= atr_period:
+            leaving = true_range[i - atr_period]
+            if np.isnan(leaving):
+                tr_nan_count -= 1
+            else:
+                tr_sum -= leaving
+        
+        indicators[i, 0] = ema_fast - ema_slow
+        if i >= ma_period - 1 and ma_nan_count == 0:
+            indicators[i, 1] = ma_sum / ma_period
+        if i >= atr_period - 1 and tr_nan_count == 0:
+            indicators[i, 2] = tr_sum / atr_period
+        indicators[i, 3] = price
+    
+    # 5期間の変化率を -100% ~ +100% にクリップ（計算できない点は0）
+    gradient_matrix = np.zeros((n, 4))
+    for i in range(GRADIENT_PERIODS, n):
+        for j in range(4):
+            gradient = (indicators[i, j] / indicators[i - GRADIENT_PERIODS, j] - 1) * 100
+            if np.isnan(gradient):
+                gradient = 0.0
+            elif gradient > 100:
+                gradient = 100.0
+            elif gradient < -100:
+                gradient = -100.0
+            gradient_matrix[i, j] = gradient
+    
+    return gradient_matrix
+
+def _gradient_backends_match(gradient_matrix_jit, length=500, seed=0):
+    """欠損を含む合成データでJIT版とpandas/NumPy版の勾配行列が一致するか確認"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, length))
+    high = close + rng.uniform(0, 0.2, length)
+    low = close - rng.uniform(0, 0.2, length)
+    # 先頭・途中の欠損と、高値/安値だけの欠損を混ぜる
+    close[[0, 50, 51, 200]] = np.nan
+    high[[120, 300]] = np.nan
+    low[[121, 400]] = np.nan
+    
+    args = (close, high, low, 12, 26, 20, 14)
+    return np.allclose(gradient_matrix_jit(*args), _gradient_matrix_numpy(*args), rtol=1e-7, atol=1e-7)
+
+if NUMBA_AVAILABLE:
+    # NaN判定を保つためfastmathは使わず、0除算はNumPyと同じくinf/NaNにする
+    compute_gradient_matrix = njit(cache=True, error_model='numpy')(_gradient_matrix_loop)
+    if not _gradient_backends_match(compute_gradient_matrix):
+        logger.warning("JIT版の勾配計算がpandas版と一致しないため、pandas版を使用します")
+        compute_gradient_matrix = _gradient_matrix_numpy
+else:
+    compute_gradient_matrix = _gradient_matrix_numpy
+
+def _analyze_pairs_chunk(calculator, currency_pairs):
+    """複数通貨ペアの勾配分析をまとめて実行（並列ワーカー用）"""
+    return [calculator.analyze_currency_pair(currency_pair) for currency_pair in currency_pairs]
+
 class FXGradientCalculator:
     """FX勾配パラメータ計算クラス"""
     
@@ -45,6 +234,9 @@ class FXGradientCalculator:
             "安値(ASK)": "low_ask", 
             "終値(ASK)": "close_ask"
         }
+        
+        # 読み込み時に型推論を省略する価格カラムの型（価格は小数5桁程度のためfloat32で十分）
+        self.price_dtypes = {col: 'float32' for col in self.column_mapping if col != "日時"}
     
     def get_available_currency_pairs(self):
         """利用可能な通貨ペアを取得"""
@@ -63,14 +255,11 @@ class FXGradientCalculator:
         """最近のデータを読み込み（過去30日分）"""
         logger.info(f"📊 {currency_pair} の過去{days_back}日分のデータを読み込み中...")
         
-        # 対象期間のZIPファイルを特定
+        # 対象期間（過去days_back日）と重なる月のZIPファイルだけを対象
         today = datetime.now()
-        target_months = []
-        
-        # 過去2ヶ月分のZIPファイルを対象
-        for month_offset in range(3):  # 余裕を持って3ヶ月
-            target_month = today - timedelta(days=30 * month_offset)
-            target_months.append(target_month.strftime('%Y%m'))
+        cutoff_date = today - timedelta(days=days_back)
+        cutoff_month = cutoff_date.strftime('%Y%m')
+        target_months = pd.period_range(cutoff_date, today, freq='M').strftime('%Y%m')
         
         all_data = []
         
@@ -81,20 +270,20 @@ class FXGradientCalculator:
             if os.path.exists(zip_path):
                 logger.info(f"   📁 {zip_pattern} を処理中...")
                 month_data = self._extract_data_from_zip(zip_path)
+                
+                # 期間の途中から始まるのは最初の月だけなので、その月だけフィルタリング
+                if year_month == cutoff_month:
+                    month_data = [data[data['timestamp'] >= cutoff_date] for data in month_data]
                 all_data.extend(month_data)
         
         if not all_data:
             logger.error(f"❌ {currency_pair} のデータが見つかりません")
             return pd.DataFrame()
         
-        # DataFrameに変換
-        df = pd.DataFrame(all_data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp').reset_index(drop=True)
-        
-        # 過去30日分にフィルタリング
-        cutoff_date = today - timedelta(days=days_back)
-        df = df[df['timestamp'] >= cutoff_date]
+        # CSVごとのDataFrameを月の昇順に結合（ほぼ時刻順に並んでいるため、並んでいなければ安定ソートで整列）
+        df = pd.concat(all_data, ignore_index=True)
+        if not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp', kind='mergesort', ignore_index=True)
         
         logger.info(f"✅ {currency_pair}: {len(df)}行のデータを読み込み完了")
         logger.info(f"   期間: {df['timestamp'].min()} ～ {df['timestamp'].max()}")
@@ -102,7 +291,7 @@ class FXGradientCalculator:
         return df
     
     def _extract_data_from_zip(self, zip_path):
-        """ZIPファイルからデータを抽出"""
+        """ZIPファイルからデータを抽出（CSVごとの中間価格DataFrameのリストを返す）"""
         data = []
         
         try:
@@ -111,34 +300,42 @@ class FXGradientCalculator:
                 
                 for csv_file in csv_files:
                     try:
-                        with zip_ref.open(csv_file) as file:
-                            # エンコーディングを試行
-                            for encoding in ['utf-8', 'shift_jis', 'cp932', 'euc_jp']:
-                                try:
-                                    content = file.read().decode(encoding)
-                                    df = pd.read_csv(io.StringIO(content))
-                                    
-                                    # カラム名を正規化
-                                    df = df.rename(columns=self.column_mapping)
-                                    
-                                    # 必要なカラムが存在するかチェック
-                                    required_cols = ['timestamp', 'open_bid', 'high_bid', 'low_bid', 'close_bid', 
-                                                   'open_ask', 'high_ask', 'low_ask', 'close_ask']
-                                    
-                                    if all(col in df.columns for col in required_cols):
-                                        # 中間価格を計算
-                                        for _, row in df.iterrows():
-                                            data.append({
-                                                'timestamp': row['timestamp'],
-                                                'open': (row['open_bid'] + row['open_ask']) / 2,
-                                                'high': (row['high_bid'] + row['high_ask']) / 2,
-                                                'low': (row['low_bid'] + row['low_ask']) / 2,
-                                                'close': (row['close_bid'] + row['close_ask']) / 2,
-                                                'volume': 1  # ダミー値
-                                            })
-                                        break
-                                except UnicodeDecodeError:
-                                    continue
+                        raw = zip_ref.read(csv_file)
+                        
+                        # エンコーディングを判定してから1回だけ読み込み（判定が外れた場合のみEUC-JPで再試行）
+                        encoding = detect_csv_encoding(raw)
+                        for encoding in (encoding, 'euc_jp'):
+                            try:
+                                # 使用するカラムだけを型指定で読み込み
+                                df = pd.read_csv(
+                                    io.BytesIO(raw),
+                                    encoding=encoding,
+                                    usecols=lambda col: col in self.column_mapping,
+                                    dtype=self.price_dtypes
+                                )
+                                break
+                            except UnicodeDecodeError:
+                                continue
+                        else:
+                            raise ValueError("エンコーディングを判定できません")
+                        
+                        # カラム名を正規化
+                        df = df.rename(columns=self.column_mapping)
+                        
+                        # 必要なカラムが存在するかチェック
+                        required_cols = ['timestamp', 'open_bid', 'high_bid', 'low_bid', 'close_bid', 
+                                       'open_ask', 'high_ask', 'low_ask', 'close_ask']
+                        
+                        if all(col in df.columns for col in required_cols):
+                            # 中間価格を列単位で一括計算
+                            data.append(pd.DataFrame({
+                                'timestamp': pd.to_datetime(df['timestamp']).to_numpy(),
+                                'open': (df['open_bid'].to_numpy() + df['open_ask'].to_numpy()) / 2,
+                                'high': (df['high_bid'].to_numpy() + df['high_ask'].to_numpy()) / 2,
+                                'low': (df['low_bid'].to_numpy() + df['low_ask'].to_numpy()) / 2,
+                                'close': (df['close_bid'].to_numpy() + df['close_ask'].to_numpy()) / 2,
+                                'volume': 1  # ダミー値
+                            }))
                     except Exception as e:
                         logger.warning(f"CSVファイル処理エラー: {csv_file} - {e}")
                         continue
@@ -155,23 +352,26 @@ class FXGradientCalculator:
         
         df = df.set_index('timestamp')
         
-        timeframes = {
-            '1min': df.resample('1T'),
-            '5min': df.resample('5T'),
-            '15min': df.resample('15T'),
-            '1hour': df.resample('1H')
+        ohlcv_agg = {
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'volume': 'sum'
         }
         
+        # 1分足を1回だけ集計し、上位足は1つ下の時間軸から順に集計（first/max/min/last/sumは段階的に集計しても同じ値）
+        timeframes = [
+            ('1min', '1min'),
+            ('5min', '5min'),
+            ('15min', '15min'),
+            ('1hour', '1h')
+        ]
+        
         resampled = {}
-        for tf_name, resampler in timeframes.items():
-            resampled[tf_name] = resampler.agg({
-                'open': 'first',
-                'high': 'max',
-                'low': 'min',
-                'close': 'last',
-                'volume': 'sum'
-            }).dropna()
-            
+        source = df
+        for tf_name, rule in timeframes:
+            source = resampled[tf_name] = source.resample(rule).agg(ohlcv_agg).dropna()
             logger.info(f"   {tf_name}: {len(resampled[tf_name])}本のローソク足")
         
         return resampled
@@ -217,17 +417,8 @@ class FXGradientCalculator:
         if len(df) < period + 10:
             return pd.Series([0] * len(df), index=df.index)
         
-        # True Range計算
-        df_copy = df.copy()
-        df_copy['prev_close'] = df_copy['close'].shift(1)
-        df_copy['tr1'] = df_copy['high'] - df_copy['low']
-        df_copy['tr2'] = abs(df_copy['high'] - df_copy['prev_close'])
-        df_copy['tr3'] = abs(df_copy['low'] - df_copy['prev_close'])
-        
-        df_copy['true_range'] = df_copy[['tr1', 'tr2', 'tr3']].max(axis=1)
-        
         # ATR計算
-        atr = df_copy['true_range'].rolling(window=period).mean()
+        atr = pd.Series(_true_range(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()), index=df.index).rolling(window=period).mean()
         
         # 勾配計算（5期間の変化率）
         atr_gradient = atr.pct_change(periods=5) * 100
@@ -243,6 +434,31 @@ class FXGradientCalculator:
         price_gradient = price_gradient.clip(-100, 100).fillna(0)
         return price_gradient
     
+    def calculate_gradients(self, df, fast=12, slow=26, ma_period=20, atr_period=14):
+        """MACD・移動平均・ATR・価格の勾配を1回でまとめて計算
+        
+        numbaがあればJITコンパイルした1パスのループ、なければpandas/NumPyの行列計算を使う。
+        結果は calculate_macd_gradient などを個別に呼んだ場合と同じ（ループ版は丸め誤差の範囲で一致）。
+        
+        Returns:
+        --------
+        dict : 勾配名 → pd.Series
+        """
+        gradient_matrix = compute_gradient_matrix(
+            df['close'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+            fast, slow, ma_period, atr_period
+        )
+        
+        # データ数が足りない指標は全て0
+        for column, min_length in enumerate((slow + 10, ma_period + 10, atr_period + 10)):
+            if len(df) < min_length:
+                gradient_matrix[:, column] = 0
+        
+        return {
+            name: pd.Series(gradient_matrix[:, i], index=df.index)
+            for i, name in enumerate(GRADIENT_NAMES)
+        }
+    
     def calculate_all_gradients(self, timeframe_data):
         """全時間軸の勾配を計算"""
         gradients = {}
@@ -259,61 +475,58 @@ class FXGradientCalculator:
             
             logger.info(f"   📈 {tf_name} の勾配計算中...")
             
-            gradients[tf_name] = {
-                'macd_gradient': self.calculate_macd_gradient(df),
-                'ma_gradient': self.calculate_ma_gradient(df),
-                'atr_gradient': self.calculate_atr_gradient(df),
-                'price_gradient': self.calculate_price_gradient(df)
-            }
+            gradients[tf_name] = self.calculate_gradients(df)
         
         return gradients
     
     def get_gradient_at_time(self, gradients, target_time):
         """指定時刻の勾配パターンを取得"""
-        pattern = []
-        
+        return self.get_gradients_at_times(gradients, [target_time])[0]
+    
+    def get_gradients_at_times(self, gradients, target_times):
+        """複数時刻の勾配パターンをまとめて取得（時刻ごとに [1min, 5min, 15min, 1hour] の複合勾配）"""
         timeframe_order = ['1min', '5min', '15min', '1hour']
         
+        # 時間軸ごとの複合勾配を全時刻分まとめて計算
+        composites = []
         for tf in timeframe_order:
             if tf not in gradients:
-                pattern.append(0.0)
+                composites.append(np.zeros(len(target_times)))
                 continue
             
             tf_gradients = gradients[tf]
             
             # 指定時刻に最も近いデータを取得
-            macd_val = self._get_closest_value(tf_gradients['macd_gradient'], target_time)
-            ma_val = self._get_closest_value(tf_gradients['ma_gradient'], target_time)
-            atr_val = self._get_closest_value(tf_gradients['atr_gradient'], target_time)
-            price_val = self._get_closest_value(tf_gradients['price_gradient'], target_time)
+            macd_vals = self._get_closest_values(tf_gradients['macd_gradient'], target_times)
+            ma_vals = self._get_closest_values(tf_gradients['ma_gradient'], target_times)
+            atr_vals = self._get_closest_values(tf_gradients['atr_gradient'], target_times)
+            price_vals = self._get_closest_values(tf_gradients['price_gradient'], target_times)
             
             # 複合勾配スコア（各指標の重み付け平均）
-            composite_gradient = (macd_val * 0.3 + ma_val * 0.3 + atr_val * 0.2 + price_val * 0.2)
-            pattern.append(round(composite_gradient, 2))
+            composites.append(macd_vals * 0.3 + ma_vals * 0.3 + atr_vals * 0.2 + price_vals * 0.2)
         
-        return pattern
+        return [
+            [round(float(composite[i]), 2) for composite in composites]
+            for i in range(len(target_times))
+        ]
     
-    def _get_closest_value(self, series, target_time):
-        """指定時刻に最も近い値を取得"""
+    def _get_closest_values(self, series, target_times):
+        """各指定時刻に最も近い値を一括取得（取得できない値は0）"""
+        values = np.zeros(len(target_times))
         if series.empty:
-            return 0.0
+            return values
         
         try:
-            # target_timeがdatetimeでない場合は変換
-            if isinstance(target_time, str):
-                target_time = pd.to_datetime(target_time)
-            
-            # 最も近いインデックスを見つける
-            idx = series.index.get_indexer([target_time], method='nearest')[0]
-            if idx >= 0 and idx < len(series):
-                value = series.iloc[idx]
-                return float(value) if not pd.isna(value) else 0.0
-            else:
-                return 0.0
+            # 最も近いインデックスを1回の探索でまとめて見つける
+            indexer = series.index.get_indexer(pd.to_datetime(target_times), method='nearest')
+            found = indexer >= 0
+            values[found] = series.to_numpy(dtype=float)[indexer[found]]
+            values[np.isnan(values)] = 0.0
+            return values
                 
         except Exception as e:
             logger.warning(f"値の取得エラー: {e}")
-            return 0.0
+            return np.zeros(len(target_times))
     
     def analyze_currency_pair(self, currency_pair):
         """特定通貨ペアの勾配分析"""
@@ -341,8 +554,8 @@ class FXGradientCalculator:
         ]
         
         results = []
-        for sample_time in sample_times:
-            pattern = self.get_gradient_at_time(gradients, sample_time)
+        patterns = self.get_gradients_at_times(gradients, sample_times)
+        for sample_time, pattern in zip(sample_times, patterns):
             results.append({
                 'time': sample_time.strftime('%Y-%m-%d %H:%M'),
                 'pattern': pattern
@@ -355,6 +568,40 @@ class FXGradientCalculator:
             'sample_results': results
         }
     
+    def analyze_currency_pairs(self, currency_pairs=None, n_jobs=None):
+        """複数通貨ペアの勾配分析（通貨ペアをワーカー数に分割して並列実行）
+        
+        Parameters:
+        -----------
+        currency_pairs : list, optional
+            分析対象の通貨ペア（省略時は利用可能な全通貨ペア）
+        n_jobs : int, optional
+            並列数（省略時はCPUコア数）
+        
+        Returns:
+        --------
+        dict : 通貨ペア → analyze_currency_pair の結果（データがなければNone）
+        """
+        if currency_pairs is None:
+            currency_pairs = self.get_available_currency_pairs()
+        currency_pairs = list(currency_pairs)
+        
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(currency_pairs))
+        if JOBLIB_AVAILABLE and n_jobs > 1:
+            # 通貨ペアごとではなくワーカーごとに1回だけ投入して受け渡しを減らす
+            chunks = [currency_pairs[k::n_jobs] for k in range(n_jobs)]
+            chunk_results = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_analyze_pairs_chunk)(self, chunk) for chunk in chunks
+            )
+            # 分割順を元の順に戻す
+            results = [None] * len(currency_pairs)
+            for k, chunk_result in enumerate(chunk_results):
+                results[k::n_jobs] = chunk_result
+        else:
+            results = _analyze_pairs_chunk(self, currency_pairs)
+        
+        return dict(zip(currency_pairs, results))
+    
     def test_gradient_calculation(self, target_currency='USDJPY'):
         """勾配計算のテスト実行"""
         logger.info("🚀 FX勾配パラメータ計算テスト開始")
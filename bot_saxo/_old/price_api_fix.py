@@ -5,19 +5,38 @@
 サクソバンクAPI価格取得の問題を修正
 """
 
-import requests
-import json
 import time
-from config import TEST_TOKEN_24H, BASE_URL
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from config import BASE_URL
+from saxo_price_client import (TIMEOUT_ERRORS, cached_get, warmup_session,
+                               parse_json, extract_quote, dump_json, short_body)
+
+# 価格取得の基本パラメータ（UICは呼び出し時に付加）
+QUOTE_PARAMS = {'AssetType': 'FxSpot', 'FieldGroups': 'Quote'}
+
+# 価格取得アプローチ（エンドポイント, UIC以外のパラメータ）
+PRICE_APPROACHES = (
+    # アプローチ1: 基本的な価格取得
+    ('/trade/v1/infoprices', QUOTE_PARAMS),
+    # アプローチ2: より詳細な情報を含む
+    ('/trade/v1/infoprices', {'AssetType': 'FxSpot', 'FieldGroups': 'Quote,PriceInfo'}),
+    # アプローチ3: 異なるエンドポイント
+    ('/trade/v1/prices', {'AssetType': 'FxSpot'})
+)
+
+# アセットタイプごとに直近で成功したアプローチ番号と、その連続失敗回数
+# 連続失敗が上限に達したら記憶を消して全アプローチから探し直す
+WINNING_APPROACH_MAX_FAILURES = 2
+_WINNING_APPROACH = {}
+_WINNING_APPROACH_FAILURES = {}
+
+# 価格取得アプローチを同時に実行するワーカー（セッションの接続プールを共有）
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
 
 def debug_price_api():
     """価格取得APIのデバッグ"""
     
-    headers = {
-        'Authorization': f'Bearer {TEST_TOKEN_24H}',
-        'Content-Type': 'application/json'
-    }
-    
     # USDJPY のUIC = 42 (前回のテストで確認済み)
     uic = 42
     
@@ -33,13 +52,13 @@ def debug_price_api():
     }
     
     try:
-        response = requests.get(f"{BASE_URL}/trade/v1/infoprices", headers=headers, params=params)
+        response = cached_get(f"{BASE_URL}/trade/v1/infoprices", params=params)
         print(f"   ステータス: {response.status_code}")
-        print(f"   レスポンス: {response.text}")
+        print(f"   レスポンス: {short_body(response)}")
         
         if response.status_code == 200:
-            data = response.json()
-            print(f"   ✅ 成功: {json.dumps(data, indent=2)}")
+            data = parse_json(response)
+            print(f"   ✅ 成功: {dump_json(data)}")
         else:
             print(f"   ❌ 失敗: {response.status_code}")
             
@@ -57,17 +76,17 @@ def debug_price_api():
                 'AssetType': 'FxSpot',
                 'FieldGroups': fg
             }
-            response = requests.get(f"{BASE_URL}/trade/v1/infoprices", headers=headers, params=params)
+            response = cached_get(f"{BASE_URL}/trade/v1/infoprices", params=params)
             print(f"   {fg}: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
-                if 'Data' in data and data['Data']:
-                    quote_data = data['Data'][0]
-                    print(f"     データキー: {list(quote_data.keys())}")
-                    if 'Quote' in quote_data:
-                        quote = quote_data['Quote']
-                        print(f"     BID: {quote.get('Bid')}, ASK: {quote.get('Ask')}")
+                data = parse_json(response)
+                rows = data.get('Data')
+                if rows:
+                    print(f"     データキー: {list(rows[0].keys())}")
+                quote = extract_quote(data)
+                if quote:
+                    print(f"     BID: {quote['bid']}, ASK: {quote['ask']}")
         except Exception as e:
             print(f"   {fg}: エラー {e}")
     
@@ -84,121 +103,111 @@ def debug_price_api():
             if endpoint == "/ref/v1/instruments/details":
                 # 詳細情報取得
                 url = f"{BASE_URL}{endpoint}/{uic}"
-                response = requests.get(url, headers=headers)
+                response = cached_get(url)
             else:
                 # 価格情報取得
                 params = {'Uics': str(uic), 'AssetType': 'FxSpot'}
-                response = requests.get(f"{BASE_URL}{endpoint}", headers=headers, params=params)
+                response = cached_get(f"{BASE_URL}{endpoint}", params=params)
             
             print(f"   {endpoint}: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = parse_json(response)
                 print(f"     キー: {list(data.keys()) if isinstance(data, dict) else 'リスト'}")
             
         except Exception as e:
             print(f"   {endpoint}: エラー {e}")
 
-def improved_get_current_price(currency_pair, currency_uic_mapping):
-    """改良版価格取得関数"""
+def _try_price_approach(approach_no, endpoint, params):
+    """価格取得アプローチ1件を実行（並列ワーカー用）
     
-    headers = {
-        'Authorization': f'Bearer {TEST_TOKEN_24H}',
-        'Content-Type': 'application/json'
-    }
+    戻り値は (価格dict、取得できなければNone, 表示メッセージのリスト)。
+    表示はアプローチ単位でまとめて呼び出し側が行う。
+    """
+    messages = [f"   アプローチ{approach_no}: {endpoint}"]
     
     try:
-        uic = currency_uic_mapping.get(currency_pair)
-        if not uic:
-            print(f"❌ UICが見つかりません: {currency_pair}")
-            return None
-        
-        print(f"🔍 価格取得開始: {currency_pair} (UIC: {uic})")
+        response = cached_get(
+            f"{BASE_URL}{endpoint}", 
+            params=params,
+            timeout=10  # タイムアウト設定
+        )
         
-        # 複数のアプローチを試行
-        approaches = [
-            # アプローチ1: 基本的な価格取得
-            {
-                'endpoint': '/trade/v1/infoprices',
-                'params': {
-                    'Uics': str(uic),
-                    'AssetType': 'FxSpot',
-                    'FieldGroups': 'Quote'
-                }
-            },
-            # アプローチ2: より詳細な情報を含む
-            {
-                'endpoint': '/trade/v1/infoprices',
-                'params': {
-                    'Uics': str(uic),
-                    'AssetType': 'FxSpot',
-                    'FieldGroups': 'Quote,PriceInfo'
-                }
-            },
-            # アプローチ3: 異なるエンドポイント
-            {
-                'endpoint': '/trade/v1/prices',
-                'params': {
-                    'Uics': str(uic),
-                    'AssetType': 'FxSpot'
-                }
-            }
-        ]
+        messages.append(f"   ステータス: {response.status_code}")
         
-        for i, approach in enumerate(approaches, 1):
-            try:
-                print(f"   アプローチ{i}: {approach['endpoint']}")
-                
-                response = requests.get(
-                    f"{BASE_URL}{approach['endpoint']}", 
-                    headers=headers, 
-                    params=approach['params'],
-                    timeout=10  # タイムアウト設定
-                )
-                
-                print(f"   ステータス: {response.status_code}")
+        if response.status_code == 200:
+            data = parse_json(response)
+            messages.append(f"   レスポンス構造: {list(data.keys())}")
+            
+            rows = data.get('Data')
+            if rows:
+                price_data = rows[0]
+                messages.append(f"   価格データ: {list(price_data.keys())}")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"   レスポンス構造: {list(data.keys())}")
-                    
-                    if 'Data' in data and data['Data']:
-                        price_data = data['Data'][0]
-                        print(f"   価格データ: {list(price_data.keys())}")
-                        
-                        # Quote情報を抽出
-                        if 'Quote' in price_data:
-                            quote = price_data['Quote']
-                            bid = quote.get('Bid')
-                            ask = quote.get('Ask')
-                            spread = quote.get('Spread')
-                            
-                            if bid and ask:
-                                print(f"   ✅ 価格取得成功: BID={bid}, ASK={ask}, Spread={spread}")
-                                return {
-                                    'bid': bid,
-                                    'ask': ask,
-                                    'spread': spread
-                                }
-                        
-                        # 他の価格情報を探す
-                        for key in price_data.keys():
-                            if 'price' in key.lower() or 'quote' in key.lower():
-                                print(f"   価格関連データ: {key} = {price_data[key]}")
+                # Quote情報を抽出
+                quote = extract_quote(data)
+                if quote:
+                    messages.append(f"   ✅ 価格取得成功: BID={quote['bid']}, ASK={quote['ask']}, Spread={quote['spread']}")
+                    return quote, messages
                 
-                elif response.status_code == 429:
-                    print(f"   ⚠️  レート制限: 2秒待機後に次のアプローチを試行")
-                    time.sleep(2)
-                    continue
-                else:
-                    print(f"   ❌ 失敗: {response.text}")
-                    
-            except requests.exceptions.Timeout:
-                print(f"   ⚠️  タイムアウト: 次のアプローチを試行")
-                continue
-            except Exception as e:
-                print(f"   ❌ エラー: {e}")
-                continue
+                # 他の価格情報を探す
+                for key in price_data.keys():
+                    if 'price' in key.lower() or 'quote' in key.lower():
+                        messages.append(f"   価格関連データ: {key} = {price_data[key]}")
+        
+        elif response.status_code == 429:
+            messages.append(f"   ⚠️  レート制限: 再試行でも解消せず")
+        else:
+            messages.append(f"   ❌ 失敗: {short_body(response)}")
+            
+    except TIMEOUT_ERRORS:
+        messages.append(f"   ⚠️  タイムアウト")
+    except Exception as e:
+        messages.append(f"   ❌ エラー: {e}")
+    
+    return None, messages
+
+def _fetch_current_price(currency_pair, uic):
+    """UICの価格を取得（前回成功したアプローチを優先し、失敗したら残りを同時に試す）"""
+    
+    try:
+        print(f"🔍 価格取得開始: {currency_pair} (UIC: {uic})")
+        
+        asset_type = QUOTE_PARAMS['AssetType']
+        uic_params = {'Uics': str(uic)}
+        
+        # 前回成功したアプローチがあれば、まずそれだけを試す（他のアプローチのパラメータは組み立てない）
+        winner = _WINNING_APPROACH.get(asset_type)
+        if winner is not None:
+            endpoint, base_params = PRICE_APPROACHES[winner - 1]
+            price, messages = _try_price_approach(winner, endpoint, {**uic_params, **base_params})
+            print("\n".join(messages))
+            if price:
+                _WINNING_APPROACH_FAILURES[asset_type] = 0
+                return price
+            
+            failures = _WINNING_APPROACH_FAILURES.get(asset_type, 0) + 1
+            _WINNING_APPROACH_FAILURES[asset_type] = failures
+            if failures >= WINNING_APPROACH_MAX_FAILURES:
+                del _WINNING_APPROACH[asset_type]
+        
+        # 残りのアプローチを同時に問い合わせ、最初に価格が取れたものを採用
+        futures = {
+            _EXECUTOR.submit(_try_price_approach, i, endpoint, {**uic_params, **base_params}): i
+            for i, (endpoint, base_params) in enumerate(PRICE_APPROACHES, 1)
+            if i != winner
+        }
+        for future in as_completed(futures):
+            price, messages = future.result()
+            print("\n".join(messages))
+            if price:
+                # 未着手のアプローチは取り消す（実行中のものは結果を待たない）
+                for pending in futures:
+                    pending.cancel()
+                if asset_type not in _WINNING_APPROACH:
+                    _WINNING_APPROACH[asset_type] = futures[future]
+                    _WINNING_APPROACH_FAILURES[asset_type] = 0
+                return price
         
         print(f"❌ 全てのアプローチで価格取得に失敗: {currency_pair}")
         return None
@@ -207,6 +216,73 @@ def improved_get_current_price(currency_pair, currency_uic_mapping):
         print(f"❌ 価格取得エラー: {e}")
         return None
 
+@lru_cache(maxsize=256)
+def _cached_price(currency_pair, uic, bucket):
+    """1秒単位の時間枠 (bucket) ごとに価格をメモ化（キャッシュできるよう (BID, ASK, スプレッド) のタプルで返す）"""
+    price = _fetch_current_price(currency_pair, uic)
+    if price is None:
+        return None
+    return price['bid'], price['ask'], price['spread']
+
+def improved_get_current_price(currency_pair, currency_uic_mapping):
+    """改良版価格取得関数
+    
+    同じ1秒の間に同じ通貨ペアを再度問い合わせた場合は、通信せずに前回の結果を返す。
+    """
+    
+    uic = currency_uic_mapping.get(currency_pair)
+    if not uic:
+        print(f"❌ UICが見つかりません: {currency_pair}")
+        return None
+    
+    price = _cached_price(currency_pair, uic, int(time.monotonic()))
+    if price is None:
+        return None
+    bid, ask, spread = price
+    return {'bid': bid, 'ask': ask, 'spread': spread}
+
+def improved_get_current_prices(currency_pairs, currency_uic_mapping):
+    """改良版価格取得関数（複数通貨ペアを1回のリクエストでまとめて取得）
+    
+    一括取得できなかった通貨ペアは improved_get_current_price で個別に取得する。
+    戻り値は 通貨ペア → {'bid', 'ask', 'spread'}（取得失敗はNone）。
+    """
+    prices = {}
+    uic_to_pair = {
+        currency_uic_mapping[currency_pair]: currency_pair
+        for currency_pair in currency_pairs
+        if currency_uic_mapping.get(currency_pair)
+    }
+    
+    if uic_to_pair:
+        print(f"🔍 一括価格取得開始: {', '.join(uic_to_pair.values())}")
+        try:
+            response = cached_get(
+                f"{BASE_URL}/trade/v1/infoprices",
+                params={'Uics': ','.join(str(uic) for uic in uic_to_pair), **QUOTE_PARAMS},
+                timeout=10
+            )
+            print(f"   ステータス: {response.status_code}")
+            
+            if response.status_code == 200:
+                for price_data in parse_json(response).get('Data', []):
+                    currency_pair = uic_to_pair.get(price_data.get('Uic'))
+                    quote = extract_quote(price_data)
+                    
+                    if currency_pair and quote:
+                        print(f"   ✅ {currency_pair}: BID={quote['bid']}, ASK={quote['ask']}, Spread={quote['spread']}")
+                        prices[currency_pair] = quote
+            
+        except Exception as e:
+            print(f"   ❌ 一括取得エラー: {e}")
+    
+    # 一括取得で得られなかった通貨ペアは個別に取得
+    for currency_pair in currency_pairs:
+        if currency_pair not in prices:
+            prices[currency_pair] = improved_get_current_price(currency_pair, currency_uic_mapping)
+    
+    return prices
+
 def test_improved_price_function():
     """改良版価格取得関数のテスト"""
     
@@ -221,10 +297,11 @@ def test_improved_price_function():
         'AUDJPY': 2
     }
     
-    # 各通貨ペアでテスト
-    for currency_pair in ['USDJPY', 'EURJPY']:
+    # 対象通貨ペアをまとめて取得
+    results = improved_get_current_prices(['USDJPY', 'EURJPY'], currency_uic_mapping)
+    
+    for currency_pair, result in results.items():
         print(f"\n--- {currency_pair} テスト ---")
-        result = improved_get_current_price(currency_pair, currency_uic_mapping)
         
         if result:
             print(f"✅ {currency_pair}: {result}")
@@ -235,6 +312,9 @@ if __name__ == "__main__":
     print("🔧 サクソバンク価格取得API修正ツール")
     print("=" * 60)
     
+    # DNS解決・TLS接続を先に済ませ、以降のAPI呼び出しでは確立済みの接続を使い回す
+    warmup_session()
+    
     # 1. APIデバッグ実行
     debug_price_api()
     
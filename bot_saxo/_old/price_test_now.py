@@ -5,14 +5,65 @@ price_test_now.py - 現在の価格取得テスト
 修正されたパラメータで価格取得をテスト
 """
 
-import requests
-import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # config.py から設定を読み込み
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import TEST_TOKEN_24H, BASE_URL
+from saxo_price_client import (TIMEOUT_ERRORS, REQUEST_ERRORS, cached_get, warmup_session,
+                               parse_json, extract_quote, dump_json, short_body)
+
+# UICマッピング（システムから取得済み）
+CURRENCY_UIC_MAPPING = {
+    'USDJPY': 42,
+    'EURJPY': 18,
+    'GBPJPY': 26,
+    'AUDJPY': 2,
+    'CHFJPY': 8,
+    'EURUSD': 21,
+    'GBPUSD': 31,
+    'AUDUSD': 4
+}
+
+# 価格取得の基本パラメータ（UICは呼び出し時に付加）
+QUOTE_PARAMS = {'AssetType': 'FxSpot', 'FieldGroups': 'Quote'}
+
+# 代替エンドポイントの試行内容（名称, エンドポイント, UICのパラメータ名, UIC以外のパラメータ）
+# エンドポイント中の {uic} は呼び出し時に置換し、UICのパラメータ名がNoneならパラメータなし
+ALTERNATIVE_APPROACHES = (
+    ('InfoPrices (複数UIC形式)', '/trade/v1/infoprices', 'Uics', QUOTE_PARAMS),  # 複数形
+    ('InfoPrices (単数UIC形式)', '/trade/v1/infoprices', 'Uic', QUOTE_PARAMS),  # 単数形
+    ('Prices エンドポイント', '/trade/v1/prices', 'Uics', {'AssetType': 'FxSpot'}),
+    ('楽器詳細情報', '/ref/v1/instruments/details/{uic}', None, {})
+)
+
+# 価格取得APIの既知のエラーステータスと表示メッセージ
+_STATUS_MSGS = {
+    400: "Bad Request (400): パラメータエラー",
+    401: "Unauthorized (401): 認証エラー\n   トークンを確認してください",
+    404: "Not Found (404): エンドポイントまたはUICが無効",
+    429: "Rate Limited (429): APIレート制限（再試行でも解消せず）"
+}
+
+# 既知のエラーでもレスポンス本文を表示するステータス（400は本文だけが拒否されたパラメータの手掛かり）
+_STATUS_SHOW_BODY = (400,)
+
+def _fetch_approach(approach):
+    """代替アプローチ1件分のリクエストを実行（並列ワーカー用、結果の表示は呼び出し側で行う）
+    
+    戻り値は (レスポンス, 例外) のどちらか一方がNone。
+    """
+    try:
+        response = cached_get(
+            f"{BASE_URL}{approach['endpoint']}",
+            params=approach['params'],
+            timeout=10
+        )
+        return response, None
+    except Exception as e:
+        return None, e
 
 def test_price_api_now():
     """現在の価格取得API テスト"""
@@ -20,22 +71,7 @@ def test_price_api_now():
     print("🔍 サクソバンク価格取得APIテスト")
     print("=" * 50)
     
-    headers = {
-        'Authorization': f'Bearer {TEST_TOKEN_24H}',
-        'Content-Type': 'application/json'
-    }
-    
-    # UICマッピング（システムから取得済み）
-    currency_mapping = {
-        'USDJPY': 42,
-        'EURJPY': 18,
-        'GBPJPY': 26,
-        'AUDJPY': 2,
-        'CHFJPY': 8,
-        'EURUSD': 21,
-        'GBPUSD': 31,
-        'AUDUSD': 4
-    }
+    currency_mapping = CURRENCY_UIC_MAPPING
     
     print(f"📊 テスト対象通貨ペア: {len(currency_mapping)}件")
     print(f"🔑 トークン: {'設定済み' if TEST_TOKEN_24H else '未設定'}")
@@ -44,72 +80,70 @@ def test_price_api_now():
     success_count = 0
     total_count = len(currency_mapping)
     
-    for currency_pair, uic in currency_mapping.items():
-        print(f"\n--- {currency_pair} (UIC: {uic}) ---")
+    # 全通貨ペアを1回のリクエストでまとめて取得（UIC → 通貨ペアで引き当て）
+    uic_to_pair = {uic: currency_pair for currency_pair, uic in currency_mapping.items()}
+    quotes = {}
+    
+    print(f"\n--- 全通貨ペア一括取得 ---")
+    
+    try:
+        params = {'Uics': ','.join(str(uic) for uic in currency_mapping.values()), **QUOTE_PARAMS}
         
-        try:
-            # 修正されたパラメータ（UicsではなくUic）
-            params = {
-                'Uic': str(uic),  # 修正: Uics → Uic
-                'AssetType': 'FxSpot',
-                'FieldGroups': 'Quote'
-            }
-            
-            print(f"   リクエストパラメータ: {params}")
-            
-            response = requests.get(
-                f"{BASE_URL}/trade/v1/infoprices", 
-                headers=headers, 
-                params=params,
-                timeout=10
-            )
-            
-            print(f"   ステータスコード: {response.status_code}")
-            
-            # ...existing code...
-            if response.status_code == 200:
-                data = response.json()
-                # Dataキーがある場合（複数通貨ペア取得時）
-                if 'Data' in data and data['Data']:
-                    price_info = data['Data'][0]
-                    if 'Quote' in price_info:
-                        quote = price_info['Quote']
-                        # ...（省略）...
-                # Dataキーがなく、直接Quoteがある場合（単一通貨ペア取得時）
-                elif 'Quote' in data:
-                    quote = data['Quote']
-                    bid = quote.get('Bid')
-                    ask = quote.get('Ask')
-                    spread = quote.get('Spread')
-                    print(f"   ✅ 価格取得成功:")
-                    print(f"      BID: {bid}")
-                    print(f"      ASK: {ask}")
-                    print(f"      スプレッド: {spread}")
-                    success_count += 1
-                else:
-                    print(f"   ⚠️  価格情報が見つかりません: {json.dumps(data, indent=4)}")
-            # ...existing code...
+        print(f"   リクエストパラメータ: {params}")
+        
+        response = cached_get(
+            f"{BASE_URL}/trade/v1/infoprices", 
+            params=params,
+            timeout=10
+        )
+        
+        print(f"   ステータスコード: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            for price_info in data.get('Data', []):
+                currency_pair = uic_to_pair.get(price_info.get('Uic'))
+                quote = extract_quote(price_info)
+                if currency_pair and quote:
+                    quotes[currency_pair] = quote
             
-            elif response.status_code == 400:
-                print(f"   ❌ Bad Request (400): パラメータエラー")
-                print(f"   レスポンス: {response.text}")
-            elif response.status_code == 401:
-                print(f"   ❌ Unauthorized (401): 認証エラー")
-                print(f"   トークンを確認してください")
-            elif response.status_code == 404:
-                print(f"   ❌ Not Found (404): エンドポイントまたはUICが無効")
-            elif response.status_code == 429:
-                print(f"   ❌ Rate Limited (429): APIレート制限")
+            if not quotes:
+                print(f"   ⚠️  価格情報が見つかりません: {dump_json(data, indent=4)}")
+        
+        else:
+            # 既知のエラーは定型メッセージを表示し、本文は400と未知のエラーのときだけ表示する
+            msg = _STATUS_MSGS.get(response.status_code)
+            if msg:
+                print(f"   ❌ {msg}")
+                if response.status_code in _STATUS_SHOW_BODY:
+                    print(f"   レスポンス: {short_body(response)}")
             else:
-                print(f"   ❌ エラー: {response.status_code}")
-                print(f"   レスポンス: {response.text}")
-                
-        except requests.exceptions.Timeout:
-            print(f"   ❌ タイムアウト: 10秒以内に応答なし")
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ リクエストエラー: {e}")
-        except Exception as e:
-            print(f"   ❌ 予期しないエラー: {e}")
+                print(f"   ❌ エラー: {response.status_code}\n   レスポンス: {short_body(response)}")
+            
+    except TIMEOUT_ERRORS:
+        print(f"   ❌ タイムアウト: 10秒以内に応答なし")
+    except REQUEST_ERRORS as e:
+        print(f"   ❌ リクエストエラー: {e}")
+    except Exception as e:
+        print(f"   ❌ 予期しないエラー: {e}")
+    
+    # 通貨ペアごとの結果表示（取得済みの応答から、1通貨ペア1回の書き込み）
+    for currency_pair, uic in currency_mapping.items():
+        lines = [f"\n--- {currency_pair} (UIC: {uic}) ---"]
+        
+        quote = quotes.get(currency_pair)
+        if quote is None:
+            lines.append(f"   ❌ 価格情報なし")
+        else:
+            lines += [
+                f"   ✅ 価格取得成功:",
+                f"      BID: {quote['bid']}",
+                f"      ASK: {quote['ask']}",
+                f"      スプレッド: {quote['spread']}"
+            ]
+            success_count += 1
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     # 結果サマリー
     print(f"\n" + "=" * 50)
@@ -135,93 +169,60 @@ def test_alternative_endpoints():
     print(f"\n🔄 代替エンドポイントテスト")
     print("=" * 30)
     
-    headers = {
-        'Authorization': f'Bearer {TEST_TOKEN_24H}',
-        'Content-Type': 'application/json'
-    }
-    
     # USDJPY (UIC: 42) でテスト
     uic = 42
     currency_pair = "USDJPY"
     
     alternative_approaches = [
         {
-            'name': 'InfoPrices (複数UIC形式)',
-            'endpoint': '/trade/v1/infoprices',
-            'params': {
-                'Uics': str(uic),  # 複数形
-                'AssetType': 'FxSpot',
-                'FieldGroups': 'Quote'
-            }
-        },
-        {
-            'name': 'InfoPrices (単数UIC形式)',
-            'endpoint': '/trade/v1/infoprices',
-            'params': {
-                'Uic': str(uic),  # 単数形
-                'AssetType': 'FxSpot', 
-                'FieldGroups': 'Quote'
-            }
-        },
-        {
-            'name': 'Prices エンドポイント',
-            'endpoint': '/trade/v1/prices',
-            'params': {
-                'Uics': str(uic),
-                'AssetType': 'FxSpot'
-            }
-        },
-        {
-            'name': '楽器詳細情報',
-            'endpoint': f'/ref/v1/instruments/details/{uic}',
-            'params': {}
+            'name': name,
+            'endpoint': endpoint.format(uic=uic),
+            'params': {uic_param: str(uic), **base_params} if uic_param else {}
         }
+        for name, endpoint, uic_param, base_params in ALTERNATIVE_APPROACHES
     ]
     
-    for approach in alternative_approaches:
-        print(f"\n--- {approach['name']} ---")
+    # 各アプローチは独立しているため共有セッションで同時に問い合わせ、表示は定義順に行う
+    with ThreadPoolExecutor(max_workers=len(alternative_approaches)) as executor:
+        fetched = list(executor.map(_fetch_approach, alternative_approaches))
+    
+    # 結果はアプローチごとにまとめて1回で書き込む
+    for approach, (response, error) in zip(alternative_approaches, fetched):
+        lines = [f"\n--- {approach['name']} ---"]
         
-        try:
-            if approach['params']:
-                response = requests.get(
-                    f"{BASE_URL}{approach['endpoint']}", 
-                    headers=headers, 
-                    params=approach['params'],
-                    timeout=10
-                )
-            else:
-                response = requests.get(
-                    f"{BASE_URL}{approach['endpoint']}", 
-                    headers=headers,
-                    timeout=10
-                )
-            
-            print(f"   ステータス: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"   ✅ 成功: {list(data.keys())}")
+        if error is not None:
+            lines.append(f"   ❌ エラー: {error}")
+        else:
+            try:
+                lines.append(f"   ステータス: {response.status_code}")
                 
-                # 価格情報を探す
-                if 'Data' in data and data['Data'] and isinstance(data['Data'], list):
-                    item = data['Data'][0]
-                    if 'Quote' in item:
-                        quote = item['Quote']
-                        print(f"   価格: BID={quote.get('Bid')}, ASK={quote.get('Ask')}")
-                elif isinstance(data, dict):
-                    # 楽器詳細の場合
-                    print(f"   詳細: {data.get('Description', 'N/A')}")
-            else:
-                print(f"   ❌ 失敗: {response.status_code}")
-                
-        except Exception as e:
-            print(f"   ❌ エラー: {e}")
+                if response.status_code == 200:
+                    data = parse_json(response)
+                    lines.append(f"   ✅ 成功: {list(data.keys())}")
+                    
+                    # 価格情報を探す
+                    quote = extract_quote(data)
+                    if quote:
+                        lines.append(f"   価格: BID={quote['bid']}, ASK={quote['ask']}")
+                    elif not data.get('Data'):
+                        # 楽器詳細の場合
+                        lines.append(f"   詳細: {data.get('Description', 'N/A')}")
+                else:
+                    lines.append(f"   ❌ 失敗: {response.status_code}")
+                    
+            except Exception as e:
+                lines.append(f"   ❌ エラー: {e}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     print("🚀 サクソバンク価格取得テストツール")
     print(f"実行時刻: {__import__('datetime').datetime.now()}")
     print("=" * 60)
     
+    # 最初の通貨ペアだけが接続確立のコストを払わないよう、先に接続を温めておく
+    warmup_session()
+    
     # メイン価格取得テスト
     main_test_success = test_price_api_now()
     
@@ -231,7 +232,7 @@ if __name__ == "__main__":
     print(f"\n🎯 推奨対応:")
     if main_test_success:
         print(f"1. fx_auto_entry_system.py の get_current_price 関数を修正")
-        print(f"2. パラメータを 'Uics' → 'Uic' に変更")
+        print(f"2. 複数通貨ペアは 'Uics' にカンマ区切りで指定して1回で取得")
         print(f"3. 17:17:00 の CHFJPY Long エントリーで再テスト")
     else:
         print(f"1. 24時間トークンの有効期限確認")
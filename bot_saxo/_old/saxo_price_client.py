@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+saxo_price_client.py - 価格取得スクリプト共通のHTTPクライアント
+price_api_fix.py / price_test_now.py で共有するセッション・リトライ・キャッシュ・レスポンス解析を提供
+"""
+
+import json
+import random
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import TEST_TOKEN_24H, BASE_URL
+
+# orjsonがあればレスポンスの解析・整形に使う
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx と h2 があればHTTP/2で1本の接続に多重化する
+try:
+    import httpx
+    import h2  # noqa: F401  httpxのHTTP/2対応に必要
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 全リクエストで共有するセッション（TCP/TLS接続を使い回す）
+_HEADERS = {
+    'Authorization': f'Bearer {TEST_TOKEN_24H}',
+    'Content-Type': 'application/json'
+}
+if HTTP2_AVAILABLE:
+    SESSION = httpx.Client(
+        http2=True,
+        headers=_HEADERS,
+        follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+    )
+    TIMEOUT_ERRORS = (httpx.TimeoutException,)
+    REQUEST_ERRORS = (httpx.HTTPError,)
+else:
+    SESSION = requests.Session()
+    SESSION.headers.update(_HEADERS)
+    SESSION.mount(BASE_URL, HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+    TIMEOUT_ERRORS = (requests.exceptions.Timeout,)
+    REQUEST_ERRORS = (requests.exceptions.RequestException,)
+
+def warmup_session():
+    """最初のAPI呼び出し前にBASE_URLへ軽いHEADリクエストを送り、DNS解決・TCP/TLS接続を済ませておく（ステータスは問わない）"""
+    try:
+        SESSION.head(BASE_URL, timeout=5)
+    except REQUEST_ERRORS as e:
+        print(f"⚠️  接続ウォームアップ失敗（続行します）: {e}")
+
+# レート制限(429)・一時的な停止(503)時のリトライ設定（指数バックオフ＋ジッター）
+RETRY_STATUS_CODES = (429, 503)
+RETRY_MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 0.1
+RETRY_CAP_SECONDS = 8.0
+
+def request_with_backoff(url, params=None, timeout=10, max_retries=RETRY_MAX_RETRIES,
+                         base=RETRY_BASE_SECONDS, cap=RETRY_CAP_SECONDS):
+    """GETリクエストを実行し、429/503の場合は同じリクエストを待機してから再試行する
+    
+    待機時間は Retry-After ヘッダーがあればその秒数（0〜capの範囲に制限）、なければ
+    random.uniform(base, min(cap, base * 2**attempt)) 秒。
+    再試行しても解消しない場合は最後のレスポンスを返す。
+    """
+    for attempt in range(max_retries + 1):
+        response = SESSION.get(url, params=params, timeout=timeout)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+            return response
+        
+        retry_after = response.headers.get('Retry-After')
+        try:
+            delay = max(0.0, min(cap, float(retry_after)))
+        except (TypeError, ValueError):
+            delay = random.uniform(base, min(cap, base * 2 ** attempt))
+        print(f"   ⚠️  {response.status_code}: {delay:.2f}秒待機して再試行 ({attempt + 1}/{max_retries})")
+        time.sleep(delay)
+
+# 成功レスポンスの短期キャッシュ（価格は1秒、銘柄詳細はほぼ不変のため24時間）
+QUOTE_CACHE_TTL = 1.0
+REFERENCE_CACHE_TTL = 86400
+CACHE_MAX_ENTRIES = 1024
+_CACHE = {}
+
+def cached_get(url, params=None, timeout=10):
+    """GETリクエストの成功レスポンスを (URL, パラメータ) 単位でTTLの間キャッシュして返す"""
+    key = (url, tuple(sorted((params or {}).items())))
+    expiry, cached_response = _CACHE.get(key, (0, None))
+    if expiry > time.monotonic():
+        return cached_response
+    
+    response = request_with_backoff(url, params=params, timeout=timeout)
+    if response.status_code == 200:
+        if len(_CACHE) >= CACHE_MAX_ENTRIES:
+            _CACHE.clear()
+        ttl = REFERENCE_CACHE_TTL if '/ref/v1/instruments/details' in url else QUOTE_CACHE_TTL
+        _CACHE[key] = (time.monotonic() + ttl, response)
+    return response
+
+# エラー時に表示するレスポンス本文の最大バイト数
+ERROR_BODY_PREVIEW_BYTES = 500
+
+def parse_json(response):
+    """レスポンス本文をJSONとして解析（orjsonがあればC実装で解析）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+def extract_quote(data):
+    """レスポンスから価格を取り出す（Data配列形式・Quote直下形式の両方に対応、BID/ASKがなければNone）"""
+    rows = data.get('Data')
+    quote = (rows[0].get('Quote') if rows else data.get('Quote')) or {}
+    bid, ask = quote.get('Bid'), quote.get('Ask')
+    return {'bid': bid, 'ask': ask, 'spread': quote.get('Spread')} if bid and ask else None
+
+def dump_json(data, indent=2):
+    """表示用にJSONを整形（orjsonは2スペースのインデントのみ対応）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=indent)
+
+def short_body(response, limit=ERROR_BODY_PREVIEW_BYTES):
+    """表示用にレスポンス本文の先頭だけをデコード（全文のデコードを避ける、本文が空なら空文字）"""
+    content = response.content
+    return content[:limit].decode('utf-8', 'replace') if content else ''
@@ -73,17 +73,43 @@ def find_csv_files(folder):
     return csv_files
 
 def save_analysis_results(results, file_path):
-    with open(file_path, 'wb') as f:
-        pickle.dump(results, f)
+    """分析結果をParquetで保存（1行=1組み合わせ、日付・pips・勝敗はリスト列）"""
+    keys = list(results)
+    table = pa.table({
+        'pair': [key[0] for key in keys],
+        'start_time': pa.array([key[1] for key in keys], type=pa.time64('us')),
+        'holding_period': pa.array([key[2] for key in keys], type=pa.int32()),
+        'direction': [key[3] for key in keys],
+        'date': pa.array([list(results[key]['date']) for key in keys], type=pa.list_(pa.timestamp('ns'))),
+        'pips': pa.array([list(results[key]['pips']) for key in keys], type=pa.list_(pa.float64())),
+        'win': pa.array([list(results[key]['win']) for key in keys], type=pa.list_(pa.bool_())),
+    })
+    pq.write_table(table, file_path)
 
 def load_analysis_results(file_path):
+    # 旧形式(pickle)のキャッシュしかない場合はそれを読み込む（次回保存時にParquetへ移行）
+    legacy_file = os.path.splitext(file_path)[0] + '.pkl'
+    if not os.path.exists(file_path) and os.path.exists(legacy_file):
+        try:
+            with open(legacy_file, 'rb') as f:
+                return pickle.load(f)
+        except (EOFError, pickle.UnpicklingError) as e:
+            print(f"警告: 分析結果ファイルの読み込みに失敗しました: {str(e)}")
+            print("新しい分析を最初から開始します。")
+            return {}
+    
     try:
-        with open(file_path, 'rb') as f:
-            return pickle.load(f)
-    except (FileNotFoundError, EOFError, pickle.UnpicklingError) as e:
+        columns = pq.read_table(file_path).to_pydict()
+    except (FileNotFoundError, pa.ArrowInvalid) as e:
         print(f"警告: 分析結果ファイルの読み込みに失敗しました: {str(e)}")
         print("新しい分析を最初から開始します。")
         return {}
+    
+    keys = zip(columns['pair'], columns['start_time'], columns['holding_period'], columns['direction'])
+    return {
+        key: {'date': dates, 'pips': pips, 'win': wins}
+        for key, dates, pips, wins in zip(keys, columns['date'], columns['pips'], columns['win'])
+    }
 
 def load_incremental_data(zip_folder, last_analyzed_date):
     new_data = []
@@ -437,9 +463,9 @@ def main(zip_folder, output_folder, settings_file, target_currency_pair=None, an
         return
 
     if target_currency_pair:
-        results_file = f"{results_file_base}_{mode_suffix}_{target_currency_pair}.pkl"
+        results_file = f"{results_file_base}_{mode_suffix}_{target_currency_pair}.parquet"
     else:
-        results_file = f"{results_file_base}_{mode_suffix}.pkl"
+        results_file = f"{results_file_base}_{mode_suffix}.parquet"
 
     os.makedirs(output_folder, exist_ok=True)
 